@@ -2,78 +2,143 @@
 Print / Export Report: month + optional user filter (superuser only), download PDF.
 
 Renders an expander with Year/Month (and optionally User) filters, then three
-download buttons: statement only, statement + receipts, receipts only.
+downloads: statement only, statement + receipts, receipts only; plus a ZIP of the original
+receipt files with a CSV manifest (utils.export_zip).
+
+The expander body runs on every Streamlit rerun, so PDFs are generated only when the user
+asks for one ("Prepare ..."). Generated PDFs (spooled temp files, on disk when large) and the
+export session behind them are kept in session state, keyed by (year, month, user, receipt
+image mode, data version), so reruns reuse them. Only the file last prepared is read back into
+memory (PDF or receipt ZIP) for its download button, and only until it is downloaded. When
+receipt images missed the deadline, "Retry missing receipts" drops the cached files.
 """
 
 from __future__ import annotations
 
+import tempfile
 from datetime import date
 from typing import Callable
 
 import streamlit as st
 
+from utils.export_session import (
+    VARIANTS,
+    VARIANT_RECEIPTS,
+    VARIANT_STATEMENT,
+    VARIANT_STATEMENT_RECEIPTS,
+    SPOOL_MAX_BYTES,
+    ExportSession,
+    iter_file_chunks,
+)
+from utils.export_zip import write_receipts_zip
+from utils.print_images import COLOR_MODE_BILEVEL, COLOR_MODE_COLOR, COLOR_MODE_GRAY
+from utils.transaction_frame import TransactionFrame
+from utils.transaction_utils import receipt_filename_from_url
+
+PDF_CACHE_KEY = "print_pdf_cache"
+ZIP_CACHE_VARIANT = "receipts_zip"  # the receipt-files ZIP, cached next to the PDF variants
+
 # Year range for the report filter
 _PRINT_YEAR_MIN = 2020
 _PRINT_YEAR_MAX = 2030
 
+_DEGRADED_NAMES_SHOWN = 10
+
+# Receipt image modes offered for receipt PDFs (utils.print_images); smaller files further down
+_COLOR_MODE_LABELS = {
+    COLOR_MODE_COLOR: "Color",
+    COLOR_MODE_GRAY: "Grayscale (smaller)",
+    COLOR_MODE_BILEVEL: "Black & white (smallest)",
+}
+
+
+def _get_pdf_cache(cache_key: tuple) -> dict:
+    """
+    Return the PDF cache entry for cache_key:
+    {"key", "session", "pdfs": {variant: file}, "degraded", "ready": variant offered for download or None}.
+    Only one (year, month, user, image mode, data version) is kept per browser session; a new
+    key replaces it and closes (deletes) the previous temp files.
+    """
+    entry = st.session_state.get(PDF_CACHE_KEY)
+    if not entry or entry.get("key") != cache_key:
+        _clear_pdf_cache()
+        entry = {"key": cache_key, "session": None, "pdfs": {}, "degraded": [], "ready": None}
+        st.session_state[PDF_CACHE_KEY] = entry
+    return entry
+
+
+def _clear_pdf_cache() -> None:
+    """Close (delete) the cached files and drop the entry, so the next Prepare renders afresh."""
+    entry = st.session_state.pop(PDF_CACHE_KEY, None)
+    for f in (entry or {}).get("pdfs", {}).values():
+        f.close()
+
+
+def _release_download(entry: dict) -> None:
+    """Download button callback: stop reading the offered file back into memory on reruns."""
+    entry["ready"] = None
+
 
-def _generate_pdf_variants(
-    pdf_generator: Callable[..., bytes],
+def _generate_pdf(
+    entry: dict,
+    variant: str,
+    export_session_factory: Callable[..., ExportSession],
     rows: list[dict],
     month_label: str,
     user_name: str,
-) -> tuple[bytes, bytes, bytes]:
+    color_mode: str,
+) -> None:
     """
-    Generate three PDF variants (statement only, statement + receipts, receipts only).
-    On TypeError (e.g. older generator without keyword args), falls back to single full PDF.
+    Render one PDF variant into a spooled temp file and store it in the cache entry.
+    The export session is reused across variants, so receipt images are fetched once.
+    Receipts drawn as placeholders (images not loaded in time) are added to entry["degraded"].
     """
-    try:
-        statement_only = pdf_generator(
-            rows,
-            include_receipts=False,
-            include_statement=True,
-            month_label=month_label,
-            user_name=user_name,
-        )
-        with_receipts = pdf_generator(
-            rows,
-            include_receipts=True,
-            include_statement=True,
-            month_label=month_label,
-            user_name=user_name,
-        )
-        receipts_only = pdf_generator(
-            rows,
-            include_receipts=True,
-            include_statement=False,
-            month_label=month_label,
-            user_name=user_name,
+    if entry["session"] is None:
+        entry["session"] = export_session_factory(
+            rows, month_label=month_label, user_name=user_name, color_mode=color_mode
         )
-        return statement_only, with_receipts, receipts_only
-    except TypeError:
-        fallback = pdf_generator(rows)
-        return fallback, fallback, fallback
+    entry["pdfs"][variant] = entry["session"].render_to_file(variant)
+    missing = {receipt_filename_from_url(url) or url for url in entry["session"].report.failures}
+    entry["degraded"] = sorted(set(entry["degraded"]) | missing)
+    if all(v in entry["pdfs"] for v in VARIANTS):
+        entry["session"] = None  # every variant is cached; release rows and images
+
+
+def _generate_zip(entry: dict, rows: list[dict]) -> None:
+    """Write the original receipt files + manifest as a ZIP into a spooled temp file in the cache entry."""
+    f = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b", suffix=".zip")
+    try:
+        report = write_receipts_zip(rows, f)
+    except BaseException:
+        f.close()
+        raise
+    entry["pdfs"][ZIP_CACHE_VARIANT] = f
+    missing = {receipt_filename_from_url(url) or url for url in report.failures}
+    entry["degraded"] = sorted(set(entry["degraded"]) | missing)
 
 
 def render_print_section(
-    transactions_getter: Callable[[date, str | None], list[dict]],
+    transactions_getter: Callable[[date, str | None], TransactionFrame],
     users: list[str],
-    pdf_generator: Callable[..., bytes],
+    export_session_factory: Callable[..., ExportSession],
     *,
     currency: str = "$",
     show_user_filter: bool = True,
     current_user: str | None = None,
+    data_version: int = 0,
 ) -> None:
     """
     Render the "Download Statement" expander with filters and PDF download buttons.
 
     Args:
-        transactions_getter: (month_date, user_or_none) -> list of transaction dicts.
+        transactions_getter: (month_date, user_or_none) -> TransactionFrame of that month's transactions.
         users: List of user identifiers for the User dropdown (when show_user_filter).
-        pdf_generator: (rows, ..., month_label=, user_name=) -> PDF bytes.
+        export_session_factory: (rows, month_label=, user_name=, color_mode=) -> ExportSession for the PDFs.
         currency: Symbol for amounts (e.g. "$", "¥").
         show_user_filter: If True, show User dropdown (for superuser). If False, report is for current_user only.
         current_user: Used when show_user_filter is False.
+        data_version: Version of the transactions data (app.data_version.data_version()); cached
+            PDFs are reused until it changes.
     """
     if "print_year" not in st.session_state:
         st.session_state["print_year"] = date.today().year
@@ -125,33 +190,86 @@ def render_print_section(
             user_val = current_user
 
         month_date = date(year, month, 1)
-        rows = transactions_getter(month_date, user_val)
+        frame = transactions_getter(month_date, user_val)
 
-        if not rows:
+        if not len(frame):
             st.info("No transactions for this period.")
             return
 
-        total = sum(float(r.get("amount") or 0) for r in rows)
-        st.caption(f"Total: {currency}{total:,.2f}")
+        st.caption(f"Total: {currency}{frame.total():,.2f}")
+        rows = frame.records()
 
         month_label = month_date.strftime("%B %Y")
         user_name = user_val or "All users"
         base_name = f"statement_{year}_{month:02d}"
 
-        try:
-            pdf_statement_only, pdf_with_receipts, pdf_receipts_only = _generate_pdf_variants(
-                pdf_generator, rows, month_label, user_name
-            )
-        except Exception as e:
-            st.error(f"PDF export failed: {e}")
-            return
+        color_mode = st.radio(
+            "Receipt images",
+            options=list(_COLOR_MODE_LABELS),
+            format_func=_COLOR_MODE_LABELS.get,
+            horizontal=True,
+            key="print_color_mode",
+        )
 
+        entry = _get_pdf_cache((year, month, user_name, color_mode, data_version))
         download_specs = [
-            ("Download statement only", pdf_statement_only, f"{base_name}.pdf", "dl_pdf_statement"),
-            ("Download statement + receipts", pdf_with_receipts, f"{base_name}_receipts.pdf", "dl_pdf_receipts"),
-            ("Download receipts only", pdf_receipts_only, f"{base_name}_receipts_only.pdf", "dl_pdf_receipts_only"),
+            ("statement only", VARIANT_STATEMENT, f"{base_name}.pdf", "dl_pdf_statement"),
+            ("statement + receipts", VARIANT_STATEMENT_RECEIPTS, f"{base_name}_receipts.pdf", "dl_pdf_receipts"),
+            ("receipts only", VARIANT_RECEIPTS, f"{base_name}_receipts_only.pdf", "dl_pdf_receipts_only"),
         ]
         dl_cols = st.columns(3)
-        for (label, data, filename, key), col in zip(download_specs, dl_cols):
+        for (label, variant, filename, key), col in zip(download_specs, dl_cols):
             with col:
-                st.download_button(label, data, file_name=filename, key=key)
+                if entry["ready"] != variant and st.button(f"Prepare {label}", key=f"prepare_{key}"):
+                    if variant not in entry["pdfs"]:
+                        with st.spinner("Generating PDF..."):
+                            try:
+                                _generate_pdf(
+                                    entry, variant, export_session_factory, rows, month_label, user_name, color_mode
+                                )
+                            except Exception as e:
+                                st.error(f"PDF export failed: {e}")
+                    if variant in entry["pdfs"]:
+                        entry["ready"] = variant
+                if entry["ready"] == variant:
+                    # Streamlit needs the payload as bytes, so only the prepared file is read back,
+                    # and clicking Download drops it again.
+                    data = b"".join(iter_file_chunks(entry["pdfs"][variant]))
+                    st.download_button(
+                        f"Download {label}", data, file_name=filename, key=key, on_click=_release_download, args=(entry,)
+                    )
+
+        has_receipts = any((r.get("receipt_url") or "").strip() for r in rows)
+        if has_receipts:
+            if entry["ready"] != ZIP_CACHE_VARIANT and st.button(
+                "Prepare receipt files (ZIP)", key="prepare_dl_receipts_zip"
+            ):
+                if ZIP_CACHE_VARIANT not in entry["pdfs"]:
+                    with st.spinner("Collecting receipt files..."):
+                        try:
+                            _generate_zip(entry, rows)
+                        except Exception as e:
+                            st.error(f"ZIP export failed: {e}")
+                if ZIP_CACHE_VARIANT in entry["pdfs"]:
+                    entry["ready"] = ZIP_CACHE_VARIANT
+            if entry["ready"] == ZIP_CACHE_VARIANT:
+                data = b"".join(iter_file_chunks(entry["pdfs"][ZIP_CACHE_VARIANT]))
+                st.download_button(
+                    "Download receipt files (ZIP)",
+                    data,
+                    file_name=f"receipts_{year}_{month:02d}.zip",
+                    mime="application/zip",
+                    key="dl_receipts_zip",
+                    on_click=_release_download,
+                    args=(entry,),
+                )
+
+        if entry["degraded"]:
+            names = entry["degraded"]
+            shown = ", ".join(names[:_DEGRADED_NAMES_SHOWN]) + (" …" if len(names) > _DEGRADED_NAMES_SHOWN else "")
+            st.warning(
+                f"{len(names)} receipt image{'s' if len(names) != 1 else ''} could not be loaded in time "
+                f"(placeholder in the PDFs, left out of the ZIP): {shown}"
+            )
+            # The files above stay cached for this data version; let the user fetch the images again.
+            st.button("Retry missing receipts", key="print_retry_degraded", on_click=_clear_pdf_cache)
@@ -3,6 +3,8 @@ Transactions table with year/month filter and per-row delete.
 
 Renders a filter bar (Year, Month), summary caption, then a table of
 transactions with columns: Date, Description, Category, Amount, receipt link, delete.
+When monthly summary rows (app.transactions.get_monthly_summary) are passed, the filter
+options and totals come from them, so they cover months whose rows are not loaded.
 """
 
 from __future__ import annotations
@@ -12,6 +14,8 @@ from typing import Callable
 
 import streamlit as st
 
+from utils.transaction_frame import TransactionFrame
+
 ALL_MONTHS_KEY = "All months"
 ALL_YEARS_KEY = "All years"
 
@@ -19,48 +23,44 @@ ALL_YEARS_KEY = "All years"
 _TABLE_COL_RATIOS = [1.5, 3, 1.5, 1, 0.8, 0.8]
 
 
-def _parse_date_year_month(date_str: str) -> tuple[int, int] | None:
-    """Return (year, month) from 'YYYY-MM-DD' or None if invalid."""
-    if not date_str or len(date_str) < 7:
-        return None
-    try:
-        dt = datetime.strptime(date_str[:10], "%Y-%m-%d")
-        return dt.year, dt.month
-    except ValueError:
-        return None
+def _summary_months(summary: list[dict], year_choice: int | str = ALL_YEARS_KEY) -> list[str]:
+    """Distinct "YYYY-MM" months of summary rows (in year_choice), newest first."""
+    months = {r["month"][:7] for r in summary if r.get("tx_count")}
+    if year_choice != ALL_YEARS_KEY:
+        months = {m for m in months if m[:4] == str(year_choice)}
+    return sorted(months, reverse=True)
 
 
-def _transaction_in_month(tx: dict, year: int, month: int) -> bool:
-    parsed = _parse_date_year_month(tx.get("date", "") or "")
-    if not parsed:
-        return False
-    y, m = parsed
-    return y == year and m == month
+def _summary_totals(summary: list[dict], year_choice: int | str, month_choice: str) -> tuple[int, float]:
+    """(transaction count, total) of summary rows in the selected year and month."""
+    months = set(_summary_months(summary, year_choice))
+    if month_choice != ALL_MONTHS_KEY:
+        months &= {month_choice}
+    rows = [r for r in summary if r["month"][:7] in months]
+    return sum(r["tx_count"] for r in rows), sum(r["total"] for r in rows)
 
 
-def _get_year_options(transactions: list[dict]) -> list[int | str]:
-    years = set()
-    for tx in transactions:
-        parsed = _parse_date_year_month(tx.get("date", "") or "")
-        if parsed:
-            years.add(parsed[0])
-    return [ALL_YEARS_KEY] + sorted(years, reverse=True)
+def _get_year_options(transactions: TransactionFrame, summary: list[dict] | None = None) -> list[int | str]:
+    if summary is not None:
+        return [ALL_YEARS_KEY] + sorted({int(m[:4]) for m in _summary_months(summary)}, reverse=True)
+    return [ALL_YEARS_KEY] + transactions.years()
 
 
-def _filter_by_year(transactions: list[dict], year_choice: int | str) -> list[dict]:
+def _filter_by_year(transactions: TransactionFrame, year_choice: int | str) -> TransactionFrame:
     if year_choice == ALL_YEARS_KEY:
         return transactions
-    year_str = str(year_choice)
-    return [tx for tx in transactions if (tx.get("date") or "")[:4] == year_str]
+    try:
+        return transactions.in_year(int(year_choice))
+    except (TypeError, ValueError):
+        return transactions
 
 
-def _get_month_options(transactions: list[dict]) -> list[str]:
-    months = set()
-    for tx in transactions:
-        date_str = tx.get("date", "") or ""
-        if len(date_str) >= 7:
-            months.add(date_str[:7])
-    return [ALL_MONTHS_KEY] + sorted(months, reverse=True)
+def _get_month_options(
+    transactions: TransactionFrame, summary: list[dict] | None = None, year_choice: int | str = ALL_YEARS_KEY
+) -> list[str]:
+    if summary is not None:
+        return [ALL_MONTHS_KEY] + _summary_months(summary, year_choice)
+    return [ALL_MONTHS_KEY] + transactions.months()
 
 
 def _format_month_option(value: str) -> str:
@@ -81,12 +81,12 @@ def _month_label_for_header(selection: str) -> str:
         return selection
 
 
-def _filter_by_month(transactions: list[dict], selection: str) -> list[dict]:
+def _filter_by_month(transactions: TransactionFrame, selection: str) -> TransactionFrame:
     if selection == ALL_MONTHS_KEY:
         return transactions
     try:
         year, month = map(int, selection.split("-"))
-        return [tx for tx in transactions if _transaction_in_month(tx, year, month)]
+        return transactions.in_month(year, month)
     except (ValueError, AttributeError):
         return transactions
 
@@ -135,19 +135,24 @@ def _render_transaction_row(
 
 
 def render_transactions_table(
-    transactions: list[dict],
+    transactions: TransactionFrame | list[dict],
     on_delete: Callable[[str], None],
     currency: str = "$",
+    summary: list[dict] | None = None,
 ) -> None:
     """
     Render the Transactions section: year/month filters and a table with delete.
 
     Args:
-        transactions: Full list of transaction dicts (filtered by this component).
+        transactions: All fetched transactions as a TransactionFrame (or list of dicts), filtered here.
         on_delete: Callback(transaction_id) called when user confirms delete.
         currency: Symbol for amounts (e.g. "$", "¥").
+        summary: Optional monthly summary rows for the same user(s); when given, year/month
+            options and totals come from it instead of from transactions.
     """
-    if not transactions:
+    if not isinstance(transactions, TransactionFrame):
+        transactions = TransactionFrame(transactions)
+    if not transactions and not (summary and _summary_months(summary)):
         st.info("No receipts recorded yet. Add one above!")
         return
 
@@ -156,14 +161,16 @@ def render_transactions_table(
     current_year = today.year
     current_month_key = today.strftime("%Y-%m")
 
-    year_options = _get_year_options(transactions)
+    year_options = _get_year_options(transactions, summary)
     if "transactions_year_filter" not in st.session_state:
         st.session_state["transactions_year_filter"] = (
             current_year if current_year in year_options else ALL_YEARS_KEY
         )
 
     by_year_for_default = _filter_by_year(transactions, st.session_state["transactions_year_filter"])
-    month_options_for_default = _get_month_options(by_year_for_default)
+    month_options_for_default = _get_month_options(
+        by_year_for_default, summary, st.session_state["transactions_year_filter"]
+    )
     if "transactions_month_filter" not in st.session_state:
         st.session_state["transactions_month_filter"] = (
             current_month_key if current_month_key in month_options_for_default else ALL_MONTHS_KEY
@@ -174,17 +181,22 @@ def render_transactions_table(
         filtered,
         st.session_state.get("transactions_month_filter", ALL_MONTHS_KEY),
     )
-    filtered = sorted(filtered, key=lambda tx: tx.get("date") or "", reverse=True)
-    n = len(filtered)
-    total = sum(float(tx.get("amount", 0) or 0) for tx in filtered) if filtered else 0
-    summary = f"{n} transaction{'s' if n != 1 else ''} · Total: {currency}{total:,.2f}"
+    if summary is not None:
+        n, total = _summary_totals(
+            summary,
+            st.session_state.get("transactions_year_filter", ALL_YEARS_KEY),
+            st.session_state.get("transactions_month_filter", ALL_MONTHS_KEY),
+        )
+    else:
+        n, total = len(filtered), filtered.total()
+    summary_text = f"{n} transaction{'s' if n != 1 else ''} · Total: {currency}{total:,.2f}"
     selected_month_for_header = st.session_state.get("transactions_month_filter", ALL_MONTHS_KEY)
     month_header = _month_label_for_header(selected_month_for_header)
 
-    with st.expander(f"**Transactions ({month_header})** — {summary}", expanded=False):
+    with st.expander(f"**Transactions ({month_header})** — {summary_text}", expanded=False):
         col_year, col_month = st.columns(2)
         with col_year:
-            year_options = _get_year_options(transactions)
+            year_options = _get_year_options(transactions, summary)
             selected_year = st.selectbox(
                 "Year",
                 options=year_options,
@@ -193,7 +205,7 @@ def render_transactions_table(
                 help="Filter transactions by year",
             )
         by_year = _filter_by_year(transactions, selected_year)
-        month_options = _get_month_options(by_year)
+        month_options = _get_month_options(by_year, summary, selected_year)
         with col_month:
             selected_month = st.selectbox(
                 "Month",
@@ -203,15 +215,21 @@ def render_transactions_table(
                 help="Filter transactions by month",
             )
 
-        filtered = _filter_by_month(by_year, selected_month)
-        filtered = sorted(filtered, key=lambda tx: tx.get("date") or "", reverse=True)
+        filtered = _filter_by_month(by_year, selected_month).newest_first()
+        expected = _summary_totals(summary, selected_year, selected_month)[0] if summary is not None else len(filtered)
 
+        if len(filtered) < expected:
+            st.info(
+                f"Showing {len(filtered)} of {expected} transactions in this period; "
+                "use **Load full history** to list them all."
+            )
         if not filtered:
-            st.info("No transactions in the selected period.")
+            if not expected:
+                st.info("No transactions in the selected period.")
         else:
-            total = sum(float(tx.get("amount", 0) or 0) for tx in filtered)
+            total = filtered.total()
             n = len(filtered)
             st.caption(f"{n} transaction{'s' if n != 1 else ''} · Total: {currency}{total:,.2f}")
             _render_table_header()
-            for tx in filtered:
+            for tx in filtered.records():
                 _render_transaction_row(tx, currency, on_delete)
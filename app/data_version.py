@@ -0,0 +1,23 @@
+"""
+Version of the transactions data as seen by this process.
+
+Every write made through the app (insert, update, delete, receipt upload) bumps it, so caches
+keyed by it (app.transactions_cache) miss after the write and serve the new rows.
+"""
+import threading
+
+_lock = threading.Lock()
+_version = 0
+
+
+def data_version() -> int:
+    """Current version; changes after every write made in this process."""
+    return _version
+
+
+def bump_data_version() -> int:
+    """Mark cached transaction reads as stale; returns the new version."""
+    global _version
+    with _lock:
+        _version += 1
+        return _version
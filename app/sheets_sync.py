@@ -64,15 +64,16 @@ def run_sync():
     Returns (success: bool, message: str).
     """
     from app.supabase_client import get_client
-    from app.transactions import get_all_transactions
+    from app.transactions import SHEETS_COLUMNS, get_all_transactions
     from app.config import USERS, SHEET_TAB_NAMES
+    from utils.transaction_frame import TransactionFrame
 
     spreadsheet_id = os.environ.get("GOOGLE_SHEETS_ID")
     if not spreadsheet_id or not spreadsheet_id.strip():
         return False, "Set GOOGLE_SHEETS_ID in .env (spreadsheet ID from the sheet URL)."
 
     try:
-        all_tx = get_all_transactions()
+        all_tx = get_all_transactions(columns=SHEETS_COLUMNS)
     except Exception as e:
         return False, f"Supabase: {e}"
 
@@ -93,9 +94,9 @@ def run_sync():
         return False, str(e)
 
     try:
+        frame = TransactionFrame(all_tx)
         for user in USERS:
-            user_rows = [t for t in all_tx if t.get("user") == user]
-            user_rows.sort(key=lambda x: (x.get("date") or "", x.get("id") or ""))
+            user_rows = frame.for_user(user).chronological().records()
             title = SHEET_TAB_NAMES.get(user, user)
             try:
                 ws = sh.worksheet(title)
@@ -10,20 +10,21 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from datetime import date
-from io import BytesIO
 
 import streamlit as st
 import httpx
 
 from app.supabase_client import get_client
-from app import upload_receipt, transactions
+from app import upload_receipt, transactions, transactions_cache
 from app.config import USERS, load_categories, DEFAULT_CURRENCY
+from app.data_version import data_version
 from app.auth import auth_enabled, check_login, is_super_user, get_data_user_for_login
 from app.components.capture_form import render_capture_form, SUCCESS_MESSAGE_KEY
 from app.components.transactions_table import render_transactions_table
 from app.components.print_section import render_print_section
 from app.sheets_sync import run_sync as run_sheets_sync
-from utils import export_statement, export_receipt
+from utils.export_session import ExportSession
+from utils.print_images import COLOR_MODE_COLOR
 
 CATEGORIES = load_categories()
 
@@ -74,7 +75,7 @@ def _handle_submit(transaction_dict, image_bytes, filename):
 def _handle_delete(transaction_id, *, allowed_user=None):
     """Delete a transaction. If allowed_user is set (regular user), only allow if transaction belongs to that user."""
     if allowed_user is not None:
-        tx = transactions.get_transaction_by_id(transaction_id)
+        tx = transactions.get_transaction_by_id(transaction_id, columns=transactions.OWNER_COLUMNS)
         if not tx or tx.get("user") != allowed_user:
             raise PermissionError("You can only delete your own transactions.")
     transactions.delete_transaction(transaction_id)
@@ -199,14 +200,20 @@ def main():
     try:
         if st.session_state.load_full_history:
             if only_my_data:
-                all_tx = transactions.get_transactions_filtered(user=selected_user)
+                all_tx = transactions_cache.get_transactions_filtered_frame(
+                    user=selected_user, columns=transactions.TABLE_COLUMNS
+                )
             else:
-                all_tx = transactions.get_all_transactions()
+                all_tx = transactions_cache.get_all_transactions_frame(columns=transactions.TABLE_COLUMNS)
         else:
             if only_my_data:
-                all_tx = transactions.get_transactions_filtered(month=current_month, user=selected_user)
+                all_tx = transactions_cache.get_transactions_filtered_frame(
+                    month=current_month, user=selected_user, columns=transactions.TABLE_COLUMNS
+                )
             else:
-                all_tx = transactions.get_transactions_filtered(month=current_month)
+                all_tx = transactions_cache.get_transactions_filtered_frame(
+                    month=current_month, columns=transactions.TABLE_COLUMNS
+                )
     except httpx.ConnectError as e:
         st.error(
             "**Cannot reach Supabase.** Check that `SUPABASE_URL` in `.env` is correct "
@@ -215,46 +222,46 @@ def main():
         )
         st.stop()
 
+    # None when the summary table is not migrated yet: options and totals come from the loaded rows
+    summary = transactions_cache.get_monthly_summary(user=selected_user if only_my_data else None)
+
     delete_callback = (lambda tid: _handle_delete(tid, allowed_user=selected_user)) if only_my_data else _handle_delete
-    render_transactions_table(all_tx, delete_callback, currency=DEFAULT_CURRENCY)
+    render_transactions_table(all_tx, delete_callback, currency=DEFAULT_CURRENCY, summary=summary)
     st.divider()
 
     if only_my_data:
         def _transactions_for_print(month_date, user_or_none):
-            return transactions.get_transactions_filtered(month=month_date, user=selected_user)
+            return transactions_cache.get_transactions_filtered_frame(
+                month=month_date, user=selected_user, columns=transactions.TABLE_COLUMNS
+            )
         report_users = [selected_user]
     else:
         def _transactions_for_print(month_date, user_or_none):
-            return transactions.get_transactions_filtered(month=month_date, user=user_or_none)
+            return transactions_cache.get_transactions_filtered_frame(
+                month=month_date, user=user_or_none, columns=transactions.TABLE_COLUMNS
+            )
         report_users = USERS
 
-    def _make_pdf(rows, include_receipts=True, include_statement=True, month_label="", user_name=""):
+    def _make_export_session(rows, month_label="", user_name="", color_mode=COLOR_MODE_COLOR):
         # When a single user is selected, filter to that user only (defensive for report/receipts)
         if user_name and user_name != "All users":
             rows = [r for r in rows if r.get("user") == user_name]
-        buf = BytesIO()
-        if not include_statement and include_receipts:
-            export_receipt.generate_receipts_pdf(rows, output_buffer=buf, heading_suffix=month_label)
-        else:
-            export_statement.generate_receipts_pdf(
-                rows,
-                output_buffer=buf,
-                receipts_per_page=15,
-                currency=DEFAULT_CURRENCY,
-                include_receipts=include_receipts,
-                include_statement=include_statement,
-                statement_month_label=month_label,
-                statement_user_name=user_name,
-            )
-        return buf.getvalue()
+        return ExportSession(
+            rows,
+            currency=DEFAULT_CURRENCY,
+            month_label=month_label,
+            user_name=user_name,
+            color_mode=color_mode,
+        )
 
     render_print_section(
         _transactions_for_print,
         report_users,
-        _make_pdf,
+        _make_export_session,
         currency=DEFAULT_CURRENCY,
         show_user_filter=not only_my_data,
         current_user=selected_user,
+        data_version=data_version(),
     )
 
 
@@ -1,33 +1,199 @@
-"""CRUD for transactions table."""
+"""CRUD for transactions table. Reads go to the local mirror (app.transactions_mirror) when it is in sync."""
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
+from typing import Iterator
 
+from postgrest.exceptions import APIError
+
+from app.data_version import bump_data_version
 from app.supabase_client import get_client, first_row
+from app.transactions_mirror import get_mirror, get_synced_mirror
 from app.upload_receipt import _amount_for_db
 
+# Column projections (PostgREST select lists) per use case; pass as columns= to the reads below.
+ALL_COLUMNS = "*"
+TABLE_COLUMNS = "id,date,user,category,amount,description,receipt_url"  # transactions table, PDF / ZIP exports
+SHEETS_COLUMNS = "id,date,user,category,amount,description,created_date,receipt_url"  # app.sheets_sync
+OWNER_COLUMNS = "id,user"  # ownership checks
+
+
+def _mirror_upsert(row: dict | None) -> None:
+    """Show a row just written to Supabase in the local mirror before the next sync."""
+    mirror = get_mirror()
+    if mirror is not None:
+        mirror.upsert(row)
+
+
+def get_all_transactions(*, columns: str = ALL_COLUMNS):
+    """Fetch all transactions (only the given columns), newest first."""
+    mirror = get_synced_mirror()
+    if mirror is not None:
+        return mirror.all_transactions(columns=columns)
+    rows = fetch_transactions(columns=columns)
+    rows.reverse()
+    return rows
+
+
+LEDGER_PAGE_SIZE = 1000  # rows per request; PostgREST caps responses at its max-rows setting
+FETCH_WORKERS = 4  # date ranges fetched concurrently by fetch_transactions
+
 
-def get_all_transactions():
-    """Fetch all transactions, newest first."""
+def _with_keyset_columns(columns: str) -> str:
+    """columns plus date and id, which keyset pagination needs."""
+    if columns == ALL_COLUMNS:
+        return columns
+    names = [c.strip() for c in columns.split(",") if c.strip()]
+    return ",".join(names + [c for c in ("date", "id") if c not in names])
+
+
+def iter_transaction_pages(
+    start: date | None = None,
+    end: date | None = None,
+    user: str | None = None,
+    *,
+    page_size: int = LEDGER_PAGE_SIZE,
+    columns: str = "*",
+) -> Iterator[list[dict]]:
+    """
+    Yield transactions in pages, oldest first (date, then id), optionally within [start, end] and for user.
+
+    Pages are fetched one at a time with keyset pagination on (date, id): each request asks
+    for rows after the last one seen, so deep pages cost the same as the first and rows
+    inserted meanwhile do not shift later pages. date and id are always selected.
+    """
+    columns = _with_keyset_columns(columns)
     client = get_client()
-    resp = client.table("transactions").select("*").order("date", desc=True).execute()
-    return resp.data or []
+    last: tuple[str, str] | None = None
+    while True:
+        q = client.table("transactions").select(columns)
+        if user:
+            q = q.eq("user", user)
+        if start:
+            q = q.gte("date", start.isoformat())
+        if end:
+            q = q.lte("date", end.isoformat())
+        if last:
+            q = q.or_(f"date.gt.{last[0]},and(date.eq.{last[0]},id.gt.{last[1]})")
+        rows = q.order("date").order("id").limit(page_size).execute().data or []
+        if not rows:
+            return
+        yield rows
+        # A short page is not proof of the end: the server may cap rows below page_size.
+        last = (rows[-1]["date"], rows[-1]["id"])
 
 
-def get_transactions_filtered(month: date | None = None, user: str | None = None):
-    """Fetch transactions optionally filtered by month and/or user."""
+def _date_bounds(user: str | None) -> tuple[date, date] | None:
+    """Earliest and latest transaction date (for user), or None if there are no transactions."""
     client = get_client()
-    q = client.table("transactions").select("*")
-    if user:
-        q = q.eq("user", user)
+    bounds = []
+    for desc in (False, True):
+        q = client.table("transactions").select("date")
+        if user:
+            q = q.eq("user", user)
+        rows = q.order("date", desc=desc).limit(1).execute().data or []
+        if not rows:
+            return None
+        bounds.append(date.fromisoformat(str(rows[0]["date"])[:10]))
+    return bounds[0], bounds[1]
+
+
+def _split_dates(start: date, end: date, parts: int) -> list[tuple[date, date]]:
+    """Split [start, end] into up to parts contiguous, non-overlapping day ranges."""
+    days = (end - start).days + 1
+    parts = max(1, min(parts, days))
+    cuts = [start + timedelta(days=days * i // parts) for i in range(parts + 1)]
+    return [(cuts[i], cuts[i + 1] - timedelta(days=1)) for i in range(parts)]
+
+
+def fetch_transactions(
+    start: date | None = None,
+    end: date | None = None,
+    user: str | None = None,
+    *,
+    columns: str = ALL_COLUMNS,
+    page_size: int = LEDGER_PAGE_SIZE,
+    max_workers: int = FETCH_WORKERS,
+) -> list[dict]:
+    """
+    Return every transaction within [start, end] (either may be None) and for user, oldest first.
+
+    Unlike a single select, the result is never truncated at PostgREST's max-rows setting: the
+    date range is split into max_workers sub-ranges, each walked with iter_transaction_pages
+    in its own thread, and the pages are joined in order. Open-ended ranges are first bounded
+    by the earliest / latest transaction date.
+    """
+    def _fetch(bounds: tuple[date | None, date | None]) -> list[dict]:
+        lo, hi = bounds
+        return [t for page in iter_transaction_pages(lo, hi, user, page_size=page_size, columns=columns) for t in page]
+
+    if max_workers <= 1:
+        return _fetch((start, end))
+    if start is None or end is None:
+        bounds = _date_bounds(user)
+        if bounds is None:
+            return []
+        start, end = start or bounds[0], end or bounds[1]
+    if end < start:
+        return []
+    ranges = _split_dates(start, end, max_workers)
+    with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        return [t for part in pool.map(_fetch, ranges) for t in part]
+
+
+def get_transactions_filtered(month: date | None = None, user: str | None = None, *, columns: str = ALL_COLUMNS):
+    """Fetch transactions (only the given columns) optionally filtered by month and/or user."""
+    start = end = None
     if month:
         start = date(month.year, month.month, 1)
         if month.month == 12:
             end = date(month.year, 12, 31)
         else:
             end = date(month.year, month.month + 1, 1) - timedelta(days=1)
-        q = q.gte("date", start.isoformat()).lte("date", end.isoformat())
-    q = q.order("date", desc=True)
-    resp = q.execute()
-    return resp.data or []
+    mirror = get_synced_mirror()
+    if mirror is not None:
+        return mirror.filtered(start, end, user, columns=columns)
+    # A month is usually one page; full history is split into concurrent ranges.
+    rows = fetch_transactions(start, end, user, columns=columns, max_workers=1 if month else FETCH_WORKERS)
+    rows.reverse()
+    return rows
+
+
+SUMMARY_TABLE = "transaction_monthly_summary"  # see migrations/20250308000004_transaction_monthly_summary.sql
+_MISSING_TABLE_CODES = ("PGRST205", "42P01")  # PostgREST schema cache miss / Postgres undefined_table
+
+
+def get_monthly_summary(
+    user: str | None = None, start: date | None = None, end: date | None = None
+) -> list[dict] | None:
+    """
+    Per (user, month, category) totals for months within [start, end], newest month first.
+
+    Rows are {"user", "month" ("YYYY-MM-01"), "category", "tx_count", "total" (float)}, read
+    from the trigger-maintained summary table (or computed by the local mirror), so the cost
+    does not depend on the number of transactions. None if the summary table does not exist
+    (migration not applied); callers then work from the transaction rows.
+    """
+    mirror = get_synced_mirror()
+    if mirror is not None:
+        return mirror.monthly_summary(user, start, end)
+    q = get_client().table(SUMMARY_TABLE).select("user,month,category,tx_count,total")
+    if user:
+        q = q.eq("user", user)
+    if start:
+        q = q.gte("month", start.replace(day=1).isoformat())
+    if end:
+        q = q.lte("month", end.replace(day=1).isoformat())
+    try:
+        rows = q.order("month", desc=True).execute().data or []
+    except APIError as e:
+        if e.code not in _MISSING_TABLE_CODES:
+            raise
+        return None
+    for r in rows:
+        r["month"] = str(r["month"])[:10]
+        r["tx_count"] = int(r.get("tx_count") or 0)
+        r["total"] = float(r.get("total") or 0)
+    return rows
 
 
 def update_transaction(
@@ -55,13 +221,19 @@ def update_transaction(
     if not payload:
         return get_transaction_by_id(id)
     resp = client.table("transactions").update(payload).eq("id", id).execute()
-    return first_row(resp, or_raise=True)
+    row = first_row(resp, or_raise=True)
+    _mirror_upsert(row)
+    bump_data_version()
+    return row
 
 
-def get_transaction_by_id(id: str) -> dict | None:
-    """Get a single transaction by id."""
+def get_transaction_by_id(id: str, *, columns: str = ALL_COLUMNS) -> dict | None:
+    """Get a single transaction (only the given columns) by id."""
+    mirror = get_synced_mirror()
+    if mirror is not None:
+        return mirror.by_id(id, columns=columns)
     client = get_client()
-    resp = client.table("transactions").select("*").eq("id", id).execute()
+    resp = client.table("transactions").select(columns).eq("id", id).execute()
     return first_row(resp)
 
 
@@ -69,3 +241,7 @@ def delete_transaction(id: str) -> None:
     """Delete a transaction by id."""
     client = get_client()
     client.table("transactions").delete().eq("id", id).execute()
+    mirror = get_mirror()
+    if mirror is not None:
+        mirror.delete(id)
+    bump_data_version()
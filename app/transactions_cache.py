@@ -0,0 +1,75 @@
+"""
+Streamlit cache for the app.transactions read functions.
+
+Streamlit reruns the whole script on every interaction; these wrappers make a rerun with the
+same query return the cached rows instead of querying again. Entries are keyed by the query
+parameters plus app.data_version, which every write made through the app bumps, so a
+session's own inserts, edits and deletes show up on the next rerun. Changes made elsewhere
+(another process, the SQL editor) show up once an entry is older than the TTL.
+
+List reads are cached as a TransactionFrame (utils.transaction_frame) built once per fetch, so
+reruns share the parsed frame instead of rebuilding it from the row dicts.
+
+Settings (environment):
+- TRANSACTIONS_CACHE_TTL: seconds a cached read is served (default 60).
+
+Public API:
+- get_all_transactions_frame(), get_transactions_filtered_frame(): the rows of
+  app.transactions.get_all_transactions() / get_transactions_filtered() as a TransactionFrame
+  (rows via records()).
+- get_transaction_by_id(), get_monthly_summary(): same signatures and results as in app.transactions.
+"""
+import os
+from datetime import date
+
+import streamlit as st
+
+from app import transactions
+from app.data_version import data_version
+from utils.transaction_frame import TransactionFrame
+
+try:
+    CACHE_TTL = float(os.environ.get("TRANSACTIONS_CACHE_TTL", 60))
+except ValueError:
+    CACHE_TTL = 60.0
+_MAX_ENTRIES = 256  # entries of superseded versions linger until they expire
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=_MAX_ENTRIES, show_spinner=False)
+def _all_transactions(version: int, columns: str) -> TransactionFrame:
+    return TransactionFrame(transactions.get_all_transactions(columns=columns))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=_MAX_ENTRIES, show_spinner=False)
+def _transactions_filtered(version: int, month: date | None, user: str | None, columns: str) -> TransactionFrame:
+    return TransactionFrame(transactions.get_transactions_filtered(month, user, columns=columns))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=_MAX_ENTRIES, show_spinner=False)
+def _transaction_by_id(version: int, id: str, columns: str) -> dict | None:
+    return transactions.get_transaction_by_id(id, columns=columns)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=_MAX_ENTRIES, show_spinner=False)
+def _monthly_summary(version: int, user: str | None, start: date | None, end: date | None) -> list[dict] | None:
+    return transactions.get_monthly_summary(user, start, end)
+
+
+def get_all_transactions_frame(*, columns: str = transactions.ALL_COLUMNS) -> TransactionFrame:
+    return _all_transactions(data_version(), columns)
+
+
+def get_transactions_filtered_frame(
+    month: date | None = None, user: str | None = None, *, columns: str = transactions.ALL_COLUMNS
+) -> TransactionFrame:
+    return _transactions_filtered(data_version(), month, user, columns)
+
+
+def get_transaction_by_id(id: str, *, columns: str = transactions.ALL_COLUMNS) -> dict | None:
+    return _transaction_by_id(data_version(), id, columns)
+
+
+def get_monthly_summary(
+    user: str | None = None, start: date | None = None, end: date | None = None
+) -> list[dict] | None:
+    return _monthly_summary(data_version(), user, start, end)
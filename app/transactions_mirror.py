@@ -0,0 +1,328 @@
+"""
+Local SQLite mirror of the transactions table for fast reads.
+
+Supabase stays the source of truth; the mirror is a read-through copy that app.transactions
+queries first. It is kept fresh incrementally: each sync pulls only rows whose updated_at is
+newer than the last high-water mark (minus a small overlap, so rows committed late with an
+older timestamp are not missed) and the ids logged in transactions_deleted since the last
+sync (see migrations/20250308000003_transactions_deleted_log.sql). Syncs are throttled, so a
+Streamlit rerun normally reads from SQLite without any network round trip. Writes made
+through app.transactions / app.upload_receipt are applied to the mirror immediately.
+
+If a sync fails, get_synced_mirror() returns None and callers query Supabase directly; the
+sync is not retried until sync_seconds have passed, so a persistent failure (e.g. a missing
+migration) costs one attempt per interval, not one per read.
+
+Settings (environment, read by get_mirror()):
+- TRANSACTIONS_MIRROR_PATH: SQLite file (default ~/.cache/organize-receipt/transactions.sqlite3).
+- TRANSACTIONS_MIRROR_SYNC_SECONDS: minimum seconds between syncs (default 10; 0 syncs on every read).
+- TRANSACTIONS_MIRROR: set to 0 to disable the mirror.
+
+Public API:
+- TransactionsMirror: sync(), failed_recently(), all_transactions(), filtered(), monthly_summary(), by_id(), upsert(),
+  delete(), reset().
+- get_mirror(): process-wide mirror configured from the environment, or None if disabled.
+- get_synced_mirror(): get_mirror() after a (throttled) sync, or None if disabled or sync failed.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from app.supabase_client import get_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIRROR_PATH = Path.home() / ".cache" / "organize-receipt" / "transactions.sqlite3"
+DEFAULT_SYNC_SECONDS = 10.0
+SYNC_OVERLAP = timedelta(seconds=60)  # re-read this much before the high-water mark
+SYNC_PAGE_SIZE = 1000
+DELETED_TABLE = "transactions_deleted"
+
+_SCHEMA = """
+create table if not exists transactions (
+  id text primary key,
+  date text,
+  user text,
+  updated_at text,
+  row text not null
+);
+create index if not exists idx_transactions_date_user on transactions (date, user);
+create table if not exists sync_state (
+  key text primary key,
+  value text
+);
+"""
+
+_default_mirror: "TransactionsMirror | None" = None
+_default_mirror_lock = threading.Lock()
+
+
+def _parse_ts(value: str) -> datetime:
+    """Parse a PostgREST timestamptz ("...T12:00:00.5+00:00" or "...Z") on Python 3.10+."""
+    s = value.strip().replace(" ", "T")
+    if s.endswith("Z"):
+        s = s[:-1] + "+00:00"
+    head, sep, rest = s.partition(".")
+    if sep:
+        tz = rest.lstrip("0123456789")
+        digits = rest[: len(rest) - len(tz)]
+        s = f"{head}.{digits[:6].ljust(6, '0')}{tz}"
+    return datetime.fromisoformat(s)
+
+
+def _norm_ts(value: str | None) -> str | None:
+    """Timestamp as fixed-width UTC ISO text, so SQLite can compare it as a string."""
+    return _parse_ts(value).astimezone(timezone.utc).isoformat(timespec="microseconds") if value else None
+
+
+def _project(row: dict, columns: str) -> dict:
+    """Keep only the comma-separated columns of row ("*" keeps all), like a PostgREST select list."""
+    if columns == "*":
+        return row
+    return {c: row[c] for c in (c.strip() for c in columns.split(",")) if c in row}
+
+
+def _since_filter(ts_col: str, last: tuple[str, str]) -> str:
+    ts, row_id = last
+    return f'{ts_col}.gt."{ts}",and({ts_col}.eq."{ts}",id.gt.{row_id})'
+
+
+def _iter_since(client, table: str, ts_col: str, since: str | None, columns: str):
+    """Yield pages of rows with ts_col > since (all rows when since is None), in (ts_col, id) order."""
+    last: tuple[str, str] | None = None
+    while True:
+        q = client.table(table).select(columns)
+        if since:
+            q = q.gt(ts_col, since)
+        if last:
+            q = q.or_(_since_filter(ts_col, last))
+        rows = q.order(ts_col).order("id").limit(SYNC_PAGE_SIZE).execute().data or []
+        if not rows:
+            return
+        yield rows
+        last = (rows[-1][ts_col], rows[-1]["id"])
+
+
+class TransactionsMirror:
+    """SQLite copy of public.transactions, synced incrementally by updated_at."""
+
+    def __init__(self, path: str | Path, sync_seconds: float = DEFAULT_SYNC_SECONDS) -> None:
+        self.path = Path(path)
+        self.sync_seconds = sync_seconds
+        self.syncs = 0
+        self._last_sync: float | None = None  # monotonic time of the last successful sync
+        self._last_failure: float | None = None  # monotonic time of the last failed sync
+        self._lock = threading.RLock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.executescript(_SCHEMA)
+
+    # -------------------------------------------------------------------------
+    # Sync state
+    # -------------------------------------------------------------------------
+    def _get_state(self, key: str) -> str | None:
+        row = self._conn.execute("select value from sync_state where key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self._conn.execute(
+            "insert into sync_state (key, value) values (?, ?) "
+            "on conflict(key) do update set value = excluded.value",
+            (key, value),
+        )
+
+    # -------------------------------------------------------------------------
+    # Sync
+    # -------------------------------------------------------------------------
+    def _pull(self, client, table: str, ts_col: str, state_key: str, columns: str, apply) -> int:
+        """Apply pages of table rows with ts_col past the state_key high-water mark; advance the mark."""
+        hwm = self._get_state(state_key)
+        newest = _parse_ts(hwm) if hwm else None
+        since = (newest - SYNC_OVERLAP).isoformat() if newest else None
+        n = 0
+        for page in _iter_since(client, table, ts_col, since, columns):
+            with self._conn:
+                self._conn.execute("begin")
+                apply(page)
+            n += len(page)
+            page_newest = max(_parse_ts(r[ts_col]) for r in page)
+            newest = page_newest if newest is None else max(newest, page_newest)
+        # The mark is written only after the last page, so an interrupted sync starts over.
+        self._set_state(state_key, newest.isoformat() if newest else "")
+        return n
+
+    def _apply_changed(self, rows: list[dict]) -> None:
+        self._conn.executemany(
+            "insert or replace into transactions (id, date, user, updated_at, row) values (?, ?, ?, ?, ?)",
+            [(r["id"], r.get("date"), r.get("user"), _norm_ts(r.get("updated_at")), json.dumps(r)) for r in rows],
+        )
+
+    def _apply_deleted(self, rows: list[dict]) -> None:
+        # A row deleted and then re-created with the same id is newer than its tombstone.
+        self._conn.executemany(
+            "delete from transactions where id = ? and (updated_at is null or updated_at <= ?)",
+            [(r["id"], _norm_ts(r["deleted_at"])) for r in rows],
+        )
+
+    def sync(self, *, force: bool = False) -> int:
+        """
+        Pull changes from Supabase unless the last sync is under sync_seconds old (or force).
+
+        Returns the number of changed and deleted rows read. Raises on network / API errors;
+        a high-water mark only advances once its table has been read to the end.
+        """
+        with self._lock:
+            if (
+                not force
+                and self._last_sync is not None
+                and time.monotonic() - self._last_sync < self.sync_seconds
+            ):
+                return 0
+            client = get_client()
+            source = os.environ.get("SUPABASE_URL", "").strip().rstrip("/")
+            if self._get_state("source") not in (None, source):
+                self.reset()  # mirrored from another project
+            self._set_state("source", source)
+            try:
+                n = self._pull(client, "transactions", "updated_at", "rows_hwm", "*", self._apply_changed)
+                n += self._pull(
+                    client, DELETED_TABLE, "deleted_at", "deleted_hwm", "id,deleted_at", self._apply_deleted
+                )
+            except Exception:
+                self._last_failure = time.monotonic()
+                raise
+            self._last_sync = time.monotonic()
+            self._last_failure = None
+            self.syncs += 1
+            return n
+
+    def failed_recently(self) -> bool:
+        """True if the last sync failed under sync_seconds ago (failures are throttled like syncs)."""
+        return self._last_failure is not None and time.monotonic() - self._last_failure < self.sync_seconds
+
+    def reset(self) -> None:
+        """Drop every mirrored row and the high-water marks; the next sync reloads the table."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("begin")
+                self._conn.execute("delete from transactions")
+                self._conn.execute("delete from sync_state")
+            self._last_sync = None
+
+    # -------------------------------------------------------------------------
+    # Reads (same rows and order as the Supabase queries in app.transactions)
+    # -------------------------------------------------------------------------
+    def _select(self, where: str = "", params: tuple = (), columns: str = "*") -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"select row from transactions {where} order by date desc, id", params
+            ).fetchall()
+        return [_project(json.loads(r[0]), columns) for r in rows]
+
+    def all_transactions(self, *, columns: str = "*") -> list[dict]:
+        """Every transaction, newest date first."""
+        return self._select(columns=columns)
+
+    def filtered(
+        self, start: date | None = None, end: date | None = None, user: str | None = None, *, columns: str = "*"
+    ) -> list[dict]:
+        """Transactions within [start, end] (either may be None) and for user, newest date first."""
+        clauses, params = [], []
+        if user:
+            clauses.append("user = ?")
+            params.append(user)
+        if start:
+            clauses.append("date >= ?")
+            params.append(start.isoformat())
+        if end:
+            clauses.append("date <= ?")
+            params.append(end.isoformat())
+        return self._select(f"where {' and '.join(clauses)}" if clauses else "", tuple(params), columns)
+
+    def monthly_summary(
+        self, user: str | None = None, start: date | None = None, end: date | None = None
+    ) -> list[dict]:
+        """Rows shaped like transaction_monthly_summary for months within [start, end], newest first."""
+        clauses, params = [], []
+        if user:
+            clauses.append("user = ?")
+            params.append(user)
+        if start:
+            clauses.append("date >= ?")
+            params.append(start.replace(day=1).isoformat())
+        if end:
+            clauses.append("substr(date, 1, 7) <= ?")
+            params.append(end.isoformat()[:7])
+        where = f"where {' and '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "select user, substr(date, 1, 7) || '-01' as month, json_extract(row, '$.category'), "
+                "count(*), sum(cast(json_extract(row, '$.amount') as real)) "
+                f"from transactions {where} group by 1, 2, 3 order by month desc, user, 3",
+                tuple(params),
+            ).fetchall()
+        return [
+            {"user": u, "month": m, "category": c, "tx_count": n, "total": total or 0.0}
+            for u, m, c, n, total in rows
+        ]
+
+    def by_id(self, id: str, *, columns: str = "*") -> dict | None:
+        with self._lock:
+            row = self._conn.execute("select row from transactions where id = ?", (id,)).fetchone()
+        return _project(json.loads(row[0]), columns) if row else None
+
+    # -------------------------------------------------------------------------
+    # Write-through (keeps this process's own writes visible before the next sync)
+    # -------------------------------------------------------------------------
+    def upsert(self, row: dict | None) -> None:
+        """Store a row as returned by an insert / update."""
+        if row and row.get("id"):
+            with self._lock, self._conn:
+                self._conn.execute("begin")
+                self._apply_changed([row])
+
+    def delete(self, id: str) -> None:
+        with self._lock:
+            self._conn.execute("delete from transactions where id = ?", (id,))
+
+
+def get_mirror() -> TransactionsMirror | None:
+    """Return the process-wide mirror configured from the environment, or None if disabled."""
+    global _default_mirror
+    with _default_mirror_lock:
+        if _default_mirror is None:
+            if os.environ.get("TRANSACTIONS_MIRROR", "1").strip().lower() in ("0", "false", "no", "off"):
+                return None
+            try:
+                sync_seconds = float(os.environ.get("TRANSACTIONS_MIRROR_SYNC_SECONDS", DEFAULT_SYNC_SECONDS))
+            except ValueError:
+                sync_seconds = DEFAULT_SYNC_SECONDS
+            path = os.environ.get("TRANSACTIONS_MIRROR_PATH", "").strip() or DEFAULT_MIRROR_PATH
+            try:
+                _default_mirror = TransactionsMirror(Path(path).expanduser(), sync_seconds=sync_seconds)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Transactions mirror disabled: %s", e)
+                return None
+        return _default_mirror
+
+
+def get_synced_mirror() -> TransactionsMirror | None:
+    """Return get_mirror() after a throttled sync; None if disabled or the sync failed."""
+    mirror = get_mirror()
+    if mirror is None or mirror.failed_recently():
+        return None
+    try:
+        mirror.sync()
+    except Exception as e:  # read directly from Supabase instead
+        logger.warning("Transactions mirror sync failed: %s", e)
+        return None
+    return mirror
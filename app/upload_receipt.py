@@ -4,7 +4,9 @@ from pathlib import Path
 from uuid import uuid4
 from datetime import date
 
+from app.data_version import bump_data_version
 from app.supabase_client import get_client, first_row
+from app.transactions_mirror import get_mirror
 
 
 BUCKET = "receipts"
@@ -31,9 +33,15 @@ def _next_receipt_number_for_user_date(user: str, transaction_date: date) -> int
     """Return next incremental number (1-based) for receipts for this user on this date."""
     client = get_client()
     date_iso = transaction_date.isoformat()
-    resp = client.table("transactions").select("id").eq("user", user.strip()).eq("date", date_iso).execute()
-    count = len(resp.data or [])
-    return count + 1
+    # HEAD request with an exact count: no rows are sent, only the Content-Range total.
+    resp = (
+        client.table("transactions")
+        .select("id", count="exact", head=True)
+        .eq("user", user.strip())
+        .eq("date", date_iso)
+        .execute()
+    )
+    return (resp.count or 0) + 1
 
 
 def upload_image(
@@ -68,6 +76,7 @@ def upload_image(
         file_bytes,
         file_options={"content-type": content_type, "upsert": "true"},
     )
+    bump_data_version()
     base = os.environ.get("SUPABASE_URL", "").rstrip("/")
     return f"{base}/storage/v1/object/public/{BUCKET}/{path}"
 
@@ -100,4 +109,9 @@ def insert_transaction(
         "created_date": today,
     }
     resp = client.table("transactions").insert(row).execute()
-    return first_row(resp, or_raise=True)
+    created = first_row(resp, or_raise=True)
+    mirror = get_mirror()
+    if mirror is not None:
+        mirror.upsert(created)
+    bump_data_version()
+    return created
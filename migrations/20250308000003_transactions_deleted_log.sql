@@ -0,0 +1,33 @@
+-- Log of deleted transaction ids, so local mirrors (app/transactions_mirror.py) can sync
+-- deletes incrementally: they read rows with deleted_at past their last high-water mark.
+create table if not exists public.transactions_deleted (
+  id uuid primary key,
+  deleted_at timestamptz not null default now()
+);
+
+create index if not exists idx_transactions_deleted_at on public.transactions_deleted (deleted_at, id);
+
+create or replace function public.log_transaction_delete()
+returns trigger as $$
+begin
+  insert into public.transactions_deleted (id, deleted_at)
+  values (old.id, now())
+  on conflict (id) do update set deleted_at = excluded.deleted_at;
+  return old;
+end;
+$$ language plpgsql security definer set search_path = public;  -- runs as owner, past RLS
+
+drop trigger if exists log_transactions_delete on public.transactions;
+create trigger log_transactions_delete
+  after delete on public.transactions
+  for each row execute function public.log_transaction_delete();
+
+-- Index for incremental sync by updated_at
+create index if not exists idx_transactions_updated_at on public.transactions (updated_at, id);
+
+alter table public.transactions_deleted enable row level security;
+
+create policy "Allow read for authenticated and anon"
+  on public.transactions_deleted
+  for select
+  using (true);
@@ -0,0 +1,63 @@
+-- Per (user, month, category) count and total of transactions, kept current by triggers, so
+-- dashboards and month pickers read a few summary rows instead of every transaction.
+create table if not exists public.transaction_monthly_summary (
+  "user" text not null,
+  month date not null,  -- first day of the month
+  category text not null,
+  tx_count bigint not null default 0,
+  total numeric not null default 0,
+  primary key ("user", month, category)
+);
+
+create index if not exists idx_transaction_monthly_summary_month on public.transaction_monthly_summary (month);
+
+create or replace function public.apply_transaction_summary_delta(
+  p_user text, p_date date, p_category text, p_count bigint, p_amount numeric
+)
+returns void as $$
+declare
+  p_month date := date_trunc('month', p_date)::date;
+begin
+  insert into public.transaction_monthly_summary as s ("user", month, category, tx_count, total)
+  values (p_user, p_month, p_category, p_count, p_amount)
+  on conflict ("user", month, category) do update
+    set tx_count = s.tx_count + excluded.tx_count,
+        total = s.total + excluded.total;
+  delete from public.transaction_monthly_summary
+  where "user" = p_user and month = p_month and category = p_category and tx_count <= 0;
+end;
+$$ language plpgsql security definer set search_path = public;  -- runs as owner, past RLS
+
+create or replace function public.update_transaction_summary()
+returns trigger as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    perform public.apply_transaction_summary_delta(old."user", old.date, old.category, -1, -old.amount);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    perform public.apply_transaction_summary_delta(new."user", new.date, new.category, 1, new.amount);
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+drop trigger if exists update_transaction_summary on public.transactions;
+create trigger update_transaction_summary
+  after insert or update of "user", date, category, amount or delete on public.transactions
+  for each row execute function public.update_transaction_summary();
+
+-- Backfill from existing transactions
+insert into public.transaction_monthly_summary ("user", month, category, tx_count, total)
+select "user", date_trunc('month', date)::date, category, count(*), sum(amount)
+from public.transactions
+group by 1, 2, 3
+on conflict ("user", month, category) do update
+  set tx_count = excluded.tx_count,
+      total = excluded.total;
+
+alter table public.transaction_monthly_summary enable row level security;
+
+create policy "Allow read for authenticated and anon"
+  on public.transaction_monthly_summary
+  for select
+  using (true);
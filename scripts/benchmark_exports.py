@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF exports against synthetic data and a local image server.
+
+Generates synthetic transactions and phone-sized receipt JPEGs (the shape
+utils.receipt_scanner.process_receipt stores; every receipt is a distinct image, as in real
+exports, so ReportLab cannot deduplicate them), serves them from a local HTTP stand-in for
+Supabase Storage with configurable latency, and times each export variant:
+
+- statement:          export_statement.generate_receipts_pdf(include_receipts=False)
+- statement_receipts: export_statement.generate_receipts_pdf(include_receipts=True)
+- receipts:           export_receipt.generate_receipts_pdf()
+
+Each variant runs in a fresh process (peak RSS is that process's own VmHWM on Linux) and
+reports wall time, peak RSS, output size, and a per-stage breakdown (fetch, prepare, render)
+from a second run that calls the stages separately. The receipt cache is disabled unless --cache is given.
+
+Run from project root:
+  uv run python scripts/benchmark_exports.py --receipts 150 --latency-ms 80
+  uv run python scripts/benchmark_exports.py --json bench.json   # machine-readable results
+  uv run python scripts/benchmark_exports.py --color-mode bilevel  # compare receipt image modes
+
+Output (--json): {"meta": {...}, "results": [{"variant", "wall_s", "peak_rss_mb",
+"output_bytes", "pages", "stages": {"fetch_s", "prepare_s", "render_s"}}, ...]}; a run that
+crashes or exceeds --timeout is reported as {"variant", "error"} and the exit status is 1.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+from queue import Empty
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+VARIANTS = ("statement", "statement_receipts", "receipts")
+DEFAULT_RUN_TIMEOUT = 1800.0  # seconds per run before the benchmark gives up on it
+
+# Phone photo cropped to the 171:365 print ratio by process_receipt, stored at quality 100
+_IMAGE_SIZE = (1890, 4032)
+_IMAGE_QUALITY = 100
+_BASE_IMAGES = 8  # receipt backgrounds; each receipt adds its own index marks on top
+_MARK_SIZE = 120  # px per bit of the index marks (survives resampling to print size)
+_CATEGORIES = ("Groceries", "Dining", "Transport", "Utilities", "Household", "Medical", "Other")
+
+
+# -----------------------------------------------------------------------------
+# Synthetic data
+# -----------------------------------------------------------------------------
+def _make_receipt_image(seed: int):
+    """Return a receipt-like PIL image: off-white paper with rows of dark 'text' and sensor noise."""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    w, h = _IMAGE_SIZE
+    img = Image.new("RGB", (w, h), (246, 244, 238))
+    draw = ImageDraw.Draw(img)
+    y = 200
+    while y < h - 200:
+        x = 150
+        while x < w - 300:
+            word = rng.randint(60, 260)
+            draw.rectangle((x, y, x + word, y + 38), fill=(rng.randint(20, 60),) * 3)
+            x += word + rng.randint(30, 70)
+        y += rng.randint(70, 110)
+    noise = Image.effect_noise((w, h), 12).convert("RGB")
+    return Image.blend(img, noise, 0.08)
+
+
+def _make_receipt_jpeg(base, index: int) -> bytes:
+    """Encode base as a JPEG with index drawn into it as a row of dark / light blocks."""
+    from PIL import ImageDraw
+
+    img = base.copy()
+    draw = ImageDraw.Draw(img)
+    for bit in range(12):
+        x = 150 + bit * _MARK_SIZE
+        fill = (20, 20, 20) if (index >> bit) & 1 else (235, 235, 235)
+        draw.rectangle((x, 40, x + _MARK_SIZE - 10, 40 + _MARK_SIZE), fill=fill)
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=_IMAGE_QUALITY)
+    return buf.getvalue()
+
+
+def _make_transactions(n_rows: int, n_receipts: int, base_url: str, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        day = date(2026, 3, rng.randint(1, 31))
+        user = rng.choice(("user-1", "user-2"))
+        url = None
+        if i < n_receipts:
+            url = f"{base_url}/receipts/{user}/{user}-{day:%m%d%y}-{i:03d}.jpg"
+        rows.append({
+            "id": f"{i:08x}-bench",
+            "date": day.isoformat(),
+            "user": user,
+            "category": rng.choice(_CATEGORIES),
+            "amount": round(rng.uniform(1, 300), 2),
+            "description": rng.choice(("", "Lunch", "Weekly shop", "Taxi to airport", "Pharmacy")),
+            "receipt_url": url,
+        })
+    return rows
+
+
+# -----------------------------------------------------------------------------
+# Local image server (stand-in for Supabase Storage)
+# -----------------------------------------------------------------------------
+def _write_receipt_files(rows: list[dict], seed: int, out_dir: Path) -> dict[str, tuple[Path, str]]:
+    """Write a distinct JPEG per receipt URL to out_dir; return {url path: (file, etag)}."""
+    from urllib.parse import urlsplit
+
+    bases = [_make_receipt_image(seed + i) for i in range(_BASE_IMAGES)]
+    files = {}
+    for i, row in enumerate(r for r in rows if r.get("receipt_url")):
+        data = _make_receipt_jpeg(bases[i % len(bases)], i)
+        path = out_dir / f"{i:05d}.jpg"
+        path.write_bytes(data)
+        files[urlsplit(row["receipt_url"]).path] = (path, hashlib.md5(data).hexdigest())
+    return files
+
+
+def _start_image_server(files: dict[str, tuple[Path, str]], latency_s: float) -> ThreadingHTTPServer:
+    """Serve the files by URL path (files may be filled after start), after latency_s; supports ETag / 304."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency_s)
+            if self.path not in files:
+                self.send_response(404)
+                self.end_headers()
+                return
+            path, digest = files[self.path]
+            etag = f'"{digest}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            data = path.read_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# -----------------------------------------------------------------------------
+# Runs (each in a fresh process)
+# -----------------------------------------------------------------------------
+def _peak_rss_mb() -> float:
+    """
+    Peak RSS of this process. On Linux, VmHWM (reset by exec), because ru_maxrss survives exec
+    and would report the parent's peak (the synthetic images) in every spawned run.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024  # KiB
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+def _count_pages(pdf: bytes) -> int:
+    return len(re.findall(rb"/Type\s*/Page(?!s)", pdf))
+
+
+def _render(
+    variant: str, rows: list[dict], images: dict | None = None, prepared: bool = False, color_mode: str = "color"
+) -> bytes:
+    """Render one variant end to end; prepared=True embeds images as given (print_dpi=None)."""
+    from utils import export_receipt, export_statement
+
+    kwargs = {"print_dpi": None} if prepared else {"color_mode": color_mode}
+    buf = BytesIO()
+    if variant == "receipts":
+        export_receipt.generate_receipts_pdf(
+            rows, output_buffer=buf, heading_suffix="March 2026", images=images, **kwargs
+        )
+    else:
+        export_statement.generate_receipts_pdf(
+            rows,
+            output_buffer=buf,
+            include_receipts=variant == "statement_receipts",
+            statement_month_label="March 2026",
+            statement_user_name="All users",
+            images=images,
+            **kwargs,
+        )
+    return buf.getvalue()
+
+
+def _run_end_to_end(variant: str, rows: list[dict], use_cache: bool, color_mode: str, queue) -> None:
+    if not use_cache:
+        os.environ["RECEIPT_CACHE_MAX_MB"] = "0"
+    start = time.perf_counter()
+    pdf = _render(variant, rows, color_mode=color_mode)
+    wall = time.perf_counter() - start
+    queue.put({"wall_s": wall, "peak_rss_mb": _peak_rss_mb(), "output_bytes": len(pdf), "pages": _count_pages(pdf)})
+
+
+def _run_stages(variant: str, rows: list[dict], use_cache: bool, color_mode: str, queue) -> None:
+    from utils.export_receipt import image_box_size
+    from utils.print_images import prepare_print_images
+    from utils.receipt_fetch import prefetch_images
+    from utils.receipt_grid import get_page_size
+
+    if not use_cache:
+        os.environ["RECEIPT_CACHE_MAX_MB"] = "0"
+    stages = {"fetch_s": 0.0, "prepare_s": 0.0, "render_s": 0.0}
+    images = {}
+    if variant != "statement":
+        t = time.perf_counter()
+        originals = prefetch_images(r.get("receipt_url") or "" for r in rows)
+        stages["fetch_s"] = time.perf_counter() - t
+        t = time.perf_counter()
+        box_w, box_h = image_box_size(get_page_size())
+        images = prepare_print_images(originals, box_w, box_h, color_mode=color_mode)
+        stages["prepare_s"] = time.perf_counter() - t
+        del originals
+    t = time.perf_counter()
+    _render(variant, rows, images, prepared=True)
+    stages["render_s"] = time.perf_counter() - t
+    queue.put(stages)
+
+
+def _in_child(target, *args, timeout: float = DEFAULT_RUN_TIMEOUT) -> dict:
+    """Run target(*args, queue) in a spawned process; raise RuntimeError if it dies or times out."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=target, args=(*args, queue))
+    proc.start()
+    give_up = time.monotonic() + timeout
+    while True:
+        try:
+            result = queue.get(timeout=1)  # before join: a large result blocks the child until read
+            break
+        except Empty:
+            if not proc.is_alive() and queue.empty():
+                proc.join()
+                raise RuntimeError(f"{target.__name__} exited with code {proc.exitcode} before reporting")
+            if time.monotonic() > give_up:
+                proc.terminate()
+                proc.join()
+                raise RuntimeError(f"{target.__name__} timed out after {timeout:.0f}s")
+    proc.join()
+    if proc.exitcode:
+        raise RuntimeError(f"{target.__name__} exited with code {proc.exitcode}")
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark statement and receipt PDF exports.")
+    parser.add_argument("--rows", type=int, default=200, help="Synthetic transactions")
+    parser.add_argument("--receipts", type=int, default=150, help="Transactions with a receipt image")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Image server latency per request")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help=f"Subset of: {', '.join(VARIANTS)}")
+    parser.add_argument("--cache", action="store_true", help="Use the on-disk receipt cache (warm after first run)")
+    parser.add_argument("--color-mode", choices=("color", "gray", "bilevel"), default="color", help="Receipt image mode")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_RUN_TIMEOUT, help="Seconds per run before it counts as failed"
+    )
+    parser.add_argument("--json", help="Write results as JSON to this path ('-' for stdout)")
+    args = parser.parse_args()
+
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown variants: {', '.join(unknown)}")
+
+    log = sys.stderr if args.json == "-" else sys.stdout
+    files: dict[str, tuple[Path, str]] = {}
+    server = _start_image_server(files, args.latency_ms / 1000)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    n_receipts = min(args.receipts, args.rows)
+    rows = _make_transactions(args.rows, n_receipts, base_url, args.seed)
+    image_dir = Path(tempfile.mkdtemp(prefix="bench-receipts-"))
+    print(f"Generating {n_receipts} synthetic {_IMAGE_SIZE[0]}x{_IMAGE_SIZE[1]} receipt images...", file=log)
+    files.update(_write_receipt_files(rows, args.seed, image_dir))
+
+    if args.cache:
+        # Isolated cache (overriding any configured one) so results do not depend on what the app has cached.
+        os.environ["RECEIPT_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-receipt-cache-")
+
+    results = []
+    try:
+        for variant in variants:
+            print(f"Running {variant}...", file=log)
+            run_args = (variant, rows, args.cache, args.color_mode)
+            try:
+                result = {"variant": variant, **_in_child(_run_end_to_end, *run_args, timeout=args.timeout)}
+                result["stages"] = _in_child(_run_stages, *run_args, timeout=args.timeout)
+            except RuntimeError as e:
+                print(f"  {variant} failed: {e}", file=log)
+                result = {"variant": variant, "error": str(e)}
+            results.append(result)
+    finally:
+        server.shutdown()
+        shutil.rmtree(image_dir, ignore_errors=True)
+
+    print(f"\n{'variant':<20}{'wall s':>9}{'rss MB':>9}{'size KB':>10}{'pages':>7}{'fetch':>8}{'prep':>8}{'render':>8}", file=log)
+    for r in results:
+        if "error" in r:
+            print(f"{r['variant']:<20}failed: {r['error']}", file=log)
+            continue
+        s = r["stages"]
+        print(
+            f"{r['variant']:<20}{r['wall_s']:>9.2f}{r['peak_rss_mb']:>9.1f}{r['output_bytes'] / 1024:>10.1f}"
+            f"{r['pages']:>7}{s['fetch_s']:>8.2f}{s['prepare_s']:>8.2f}{s['render_s']:>8.2f}",
+            file=log,
+        )
+
+    # Sanity check: the statement carries no images, so a peak close to the receipt variants'
+    # means the runs are not measured in isolation.
+    peaks = {r["variant"]: r["peak_rss_mb"] for r in results if "error" not in r}
+    if "statement" in peaks:
+        with_images = [peaks[v] for v in ("statement_receipts", "receipts") if v in peaks]
+        if with_images and peaks["statement"] > 0.8 * min(with_images):
+            print(
+                f"\nWarning: statement peak RSS ({peaks['statement']:.1f} MB) is not clearly below the receipt "
+                f"variants ({min(with_images):.1f} MB); peak RSS may not be per run on this platform.",
+                file=log,
+            )
+
+    if args.json:
+        payload = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "rows": args.rows,
+                "receipts": n_receipts,
+                "latency_ms": args.latency_ms,
+                "cache": args.cache,
+                "color_mode": args.color_mode,
+                "image_size": list(_IMAGE_SIZE),
+            },
+            "results": results,
+        }
+        text = json.dumps(payload, indent=2)
+        if args.json == "-":
+            print(text)
+        else:
+            Path(args.json).write_text(text + "\n")
+            print(f"\nWrote {args.json}", file=log)
+    if any("error" in r for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
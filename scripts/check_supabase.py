@@ -80,7 +80,7 @@ def main():
     if full and client:
         print("4. Insert / select (--full)")
         try:
-            from app.transactions import get_all_transactions, delete_transaction
+            from app.transactions import OWNER_COLUMNS, delete_transaction
             from app.upload_receipt import insert_transaction
             from datetime import date
             row = insert_transaction(
@@ -93,8 +93,8 @@ def main():
             )
             print("   OK: Insert succeeded.")
             tx_id = row["id"]
-            rows = get_all_transactions()
-            if any(r["id"] == tx_id for r in rows):
+            # Query Supabase itself (app.transactions reads may be served by the local mirror)
+            if client.table("transactions").select(OWNER_COLUMNS).eq("id", tx_id).execute().data:
                 print("   OK: Select found the row.")
             delete_transaction(tx_id)
             print("   OK: Test row deleted.")
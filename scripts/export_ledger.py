@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Ledger export: every transaction in a date range as CSV or XLSX, straight from Supabase.
+
+Rows are read page by page (app.transactions.iter_transaction_pages, keyset pagination) and
+written as they arrive (utils.export_ledger), so memory does not grow with the number of rows.
+The format follows the --out extension (.csv or .xlsx; XLSX needs openpyxl).
+
+Run from project root:
+  uv run python scripts/export_ledger.py --out ledger.csv                         # full history
+  uv run python scripts/export_ledger.py --start 2026-01 --end 2026-12 --out 2026.xlsx
+  uv run python scripts/export_ledger.py --start 2026-03-01 --end 2026-03-15 --user user-1 --out half.csv
+"""
+
+import argparse
+import calendar
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(ROOT / ".env")
+except ImportError:
+    pass
+
+from app.transactions import LEDGER_PAGE_SIZE, iter_transaction_pages
+from utils.export_ledger import LEDGER_COLUMNS, write_ledger
+
+
+def _parse_day(value: str, *, end_of_month: bool = False) -> date:
+    """YYYY-MM-DD, or YYYY-MM (first day; last day with end_of_month)."""
+    try:
+        if len(value) == 7:
+            year, month = map(int, value.split("-"))
+            day = calendar.monthrange(year, month)[1] if end_of_month else 1
+            return date(year, month, day)
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM or YYYY-MM-DD, got {value!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export transactions in a date range as CSV or XLSX.")
+    parser.add_argument("--start", type=_parse_day, help="First day (YYYY-MM-DD or YYYY-MM; default: no limit)")
+    parser.add_argument(
+        "--end",
+        type=lambda v: _parse_day(v, end_of_month=True),
+        help="Last day, inclusive (YYYY-MM-DD or YYYY-MM; default: no limit)",
+    )
+    parser.add_argument("--user", help="Only this user's transactions")
+    parser.add_argument("--out", required=True, help="Output path ending in .csv or .xlsx")
+    parser.add_argument("--page-size", type=int, default=LEDGER_PAGE_SIZE, help="Rows per Supabase request")
+    args = parser.parse_args()
+
+    if args.start and args.end and args.end < args.start:
+        parser.error("--end is before --start")
+    if not args.out.lower().endswith((".csv", ".xlsx")):
+        parser.error("--out must end in .csv or .xlsx")
+
+    started = time.perf_counter()
+    pages = iter_transaction_pages(
+        args.start, args.end, args.user, page_size=max(1, args.page_size), columns=",".join(LEDGER_COLUMNS)
+    )
+    n = write_ledger(pages, args.out)
+    print(f"Wrote {n} transactions to {args.out} in {time.perf_counter() - started:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
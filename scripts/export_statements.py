@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Batch statement export: build every (month, user, variant) PDF for a date range without the app.
+
+Transactions are fetched and parsed into one TransactionFrame, split with
+export_statement.transactions_for_month_user, and each (month, user) is rendered in its own
+process (all variants share one export session, so receipt images are fetched once per month
+and user). Output goes to a directory or a .zip file, with the same file names as the app's
+download buttons plus the user.
+
+Run from project root:
+  uv run python scripts/export_statements.py --start 2026-01 --end 2026-12 --out exports/
+  uv run python scripts/export_statements.py --start 2026-01 --end 2026-03 --users user-1,all \\
+      --variants statement,receipts --jobs 4 --out year_end.zip
+  uv run python scripts/export_statements.py --start 2026-03 --max-mb 9.5 --out mail/   # size-capped
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(ROOT / ".env")
+except ImportError:
+    pass
+
+from utils.export_session import (
+    VARIANTS,
+    VARIANT_RECEIPTS,
+    VARIANT_STATEMENT,
+    VARIANT_STATEMENT_RECEIPTS,
+    ExportSession,
+)
+from utils.export_statement import transactions_for_month_user
+from utils.print_images import COLOR_MODE_COLOR, COLOR_MODES
+from utils.transaction_frame import TransactionFrame
+
+ALL_USERS = "all"  # --users keyword for the combined "All users" statement
+
+# Same suffixes as the download buttons in app/components/print_section.py
+_VARIANT_SUFFIX = {
+    VARIANT_STATEMENT: "",
+    VARIANT_STATEMENT_RECEIPTS: "_receipts",
+    VARIANT_RECEIPTS: "_receipts_only",
+}
+
+
+def _parse_month(value: str) -> date:
+    try:
+        year, month = map(int, value.split("-"))
+        return date(year, month, 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}")
+
+
+def _months(start: date, end: date) -> list[date]:
+    out = []
+    d = start
+    while d <= end:
+        out.append(d)
+        d = date(d.year + (d.month == 12), d.month % 12 + 1, 1)
+    return out
+
+
+def _export_one(
+    rows: list[dict],
+    month: date,
+    user: str | None,
+    variants: list[str],
+    currency: str,
+    out_dir: str,
+    max_bytes: int | None = None,
+    color_mode: str = COLOR_MODE_COLOR,
+    processes: int | None = None,
+) -> tuple[list[str], list[str]]:
+    """
+    Worker: render the requested variants for one (month, user).
+    Returns (written paths, receipt URLs drawn as placeholders because their image was not loaded).
+    """
+    user_name = user or "All users"
+    session = ExportSession(
+        rows,
+        currency=currency,
+        month_label=month.strftime("%B %Y"),
+        user_name=user_name,
+        max_bytes=max_bytes,
+        color_mode=color_mode,
+        processes=processes,
+    )
+    base_name = f"statement_{month.year}_{month.month:02d}_{user or ALL_USERS}"
+    paths = []
+    # Receipts only first: for large exports it prepares the images in parallel for the rest.
+    for variant in sorted(variants, key=lambda v: v != VARIANT_RECEIPTS):
+        path = Path(out_dir) / f"{base_name}{_VARIANT_SUFFIX[variant]}.pdf"
+        session.render(variant, output_path=path)
+        paths.append(str(path))
+    return paths, sorted(session.report.failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export statement PDFs for a range of months and users.")
+    parser.add_argument("--start", type=_parse_month, required=True, help="First month (YYYY-MM)")
+    parser.add_argument("--end", type=_parse_month, help="Last month (YYYY-MM, default: --start)")
+    parser.add_argument(
+        "--users",
+        help=f"Comma-separated users; '{ALL_USERS}' adds the combined statement (default: USERS from .env)",
+    )
+    parser.add_argument(
+        "--variants",
+        default=",".join(VARIANTS),
+        help=f"Comma-separated subset of: {', '.join(VARIANTS)}",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallel export processes")
+    parser.add_argument("--out", required=True, help="Output directory, or a path ending in .zip")
+    parser.add_argument(
+        "--max-mb", type=float, help="Size cap per PDF in MB; receipt images are downsized to fit"
+    )
+    parser.add_argument(
+        "--color-mode",
+        choices=COLOR_MODES,
+        default=COLOR_MODE_COLOR,
+        help="Receipt images: color JPEG, or lossless gray / bilevel (much smaller)",
+    )
+    parser.add_argument("--skip-empty", action="store_true", help="Skip months with no transactions")
+    args = parser.parse_args()
+
+    from app.config import USERS, DEFAULT_CURRENCY
+    from app.transactions import TABLE_COLUMNS, get_all_transactions
+
+    end = args.end or args.start
+    if end < args.start:
+        parser.error("--end is before --start")
+    users = [u.strip() for u in (args.users or ",".join(USERS)).split(",") if u.strip()]
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown variants: {', '.join(unknown)}")
+
+    print("Fetching transactions from Supabase...")
+    all_tx = TransactionFrame(get_all_transactions(columns=TABLE_COLUMNS))
+
+    tasks = []
+    for month in _months(args.start, end):
+        for u in users:
+            user = None if u == ALL_USERS else u
+            rows = transactions_for_month_user(all_tx, month, user)
+            if rows or not args.skip_empty:
+                tasks.append((rows, month, user))
+    if not tasks:
+        print("Nothing to export.")
+        return
+
+    max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb else None
+    to_zip = args.out.lower().endswith(".zip")
+    out_dir = Path(tempfile.mkdtemp(prefix="statements-")) if to_zip else Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    written = []
+    failed = 0
+    jobs = max(1, min(args.jobs, len(tasks)))
+    # Large receipts-only PDFs render their pages in parallel too; share the CPUs among the jobs.
+    processes = max(1, (os.cpu_count() or 1) // jobs)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(
+                _export_one,
+                rows,
+                month,
+                user,
+                variants,
+                DEFAULT_CURRENCY,
+                str(out_dir),
+                max_bytes,
+                args.color_mode,
+                processes,
+            ): (month, user)
+            for rows, month, user in tasks
+        }
+        for future in as_completed(futures):
+            month, user = futures[future]
+            label = f"{month:%Y-%m} {user or ALL_USERS}"
+            try:
+                paths, degraded = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"  FAIL {label}: {e}")
+                continue
+            written.extend(paths)
+            note = f", {len(degraded)} receipt image(s) missing" if degraded else ""
+            print(f"  OK   {label} ({len(paths)} PDF{'s' if len(paths) != 1 else ''}{note})")
+            for url in degraded:
+                print(f"         missing: {url}")
+
+    if to_zip:
+        # PDFs are already compressed; store them as is.
+        with zipfile.ZipFile(args.out, "w", compression=zipfile.ZIP_STORED) as zf:
+            for path in sorted(written):
+                zf.write(path, arcname=Path(path).name)
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    print(f"Wrote {len(written)} PDFs to {args.out}" + (f"; {failed} failed." if failed else "."))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
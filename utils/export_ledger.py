@@ -0,0 +1,99 @@
+"""
+Ledger export: transactions as CSV or XLSX, written row by row.
+
+Rows come from an iterable of pages (e.g. app.transactions.iter_transaction_pages), and each
+page is written and dropped before the next is fetched, so memory stays constant however many
+rows the range holds. XLSX uses openpyxl's write-only mode (pip install openpyxl); CSV needs
+nothing extra.
+
+Public API:
+- write_ledger_csv(): write pages of transaction dicts as CSV; returns the row count.
+- write_ledger_xlsx(): same as an .xlsx workbook (one sheet).
+- write_ledger(): pick CSV or XLSX from the output file name.
+- LEDGER_COLUMNS: column order of both formats.
+"""
+
+from __future__ import annotations
+
+import csv
+from datetime import date
+from pathlib import Path
+from typing import BinaryIO, Iterable, TextIO
+
+try:
+    from openpyxl import Workbook
+
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+LEDGER_COLUMNS = ["date", "user", "category", "amount", "description", "receipt_url", "id"]
+
+
+def _amount(value) -> float | str:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return "" if value is None else str(value)
+
+
+def _date(value) -> date | str:
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return "" if value is None else str(value)
+
+
+def write_ledger_csv(pages: Iterable[list[dict]], output: str | Path | TextIO) -> int:
+    """
+    Write transactions as CSV with a LEDGER_COLUMNS header; return the number of rows written.
+
+    output is a path (written as UTF-8 with BOM, so spreadsheet apps detect the encoding) or
+    a text file opened with newline="".
+    """
+    if isinstance(output, (str, Path)):
+        with open(output, "w", newline="", encoding="utf-8-sig") as f:
+            return write_ledger_csv(pages, f)
+    writer = csv.writer(output)
+    writer.writerow(LEDGER_COLUMNS)
+    n = 0
+    for page in pages:
+        writer.writerows([t.get(col) if t.get(col) is not None else "" for col in LEDGER_COLUMNS] for t in page)
+        n += len(page)
+    return n
+
+
+def write_ledger_xlsx(pages: Iterable[list[dict]], output: str | Path | BinaryIO, *, title: str = "Ledger") -> int:
+    """
+    Write transactions to an .xlsx workbook (dates as dates, amounts as numbers); return the row count.
+
+    Uses openpyxl's write-only workbook, which streams rows to a temp file instead of
+    keeping cells in memory.
+    """
+    if not HAS_OPENPYXL:
+        raise RuntimeError("Install openpyxl for XLSX export: pip install openpyxl")
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title[:31])
+    ws.append(LEDGER_COLUMNS)
+    n = 0
+    for page in pages:
+        for t in page:
+            ws.append([
+                _date(t.get("date")),
+                t.get("user") or "",
+                t.get("category") or "",
+                _amount(t.get("amount")),
+                t.get("description") or "",
+                t.get("receipt_url") or "",
+                t.get("id") or "",
+            ])
+        n += len(page)
+    wb.save(output)
+    return n
+
+
+def write_ledger(pages: Iterable[list[dict]], path: str | Path) -> int:
+    """Write CSV, or XLSX when path ends in .xlsx; return the row count."""
+    if str(path).lower().endswith(".xlsx"):
+        return write_ledger_xlsx(pages, path)
+    return write_ledger_csv(pages, path)
@@ -0,0 +1,198 @@
+"""
+Parallel receipts-only PDF export for very large exports (year-end, thousands of receipts).
+
+Receipts are sorted and filtered once, split into page-aligned ranges, and each range is
+fetched, resampled and rendered into a partial PDF by utils.export_receipt in a separate
+process. The parts are then merged in order, so headings and page order match the serial
+path. Merging uses pypdf (a project dependency); without it, or for small exports, the
+serial export_receipt.generate_receipts_pdf is used. Fetching and resampling the images is
+most of the work, so the parallel path pays off when the workers fetch their own images;
+the print-ready images can be handed back (prepared=) for rendering other variants.
+
+Public API:
+- generate_receipts_pdf_parallel(): receipts-only PDF rendered across a process pool.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Mapping
+
+try:
+    from pypdf import PdfReader, PdfWriter
+
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+
+from utils import export_receipt
+from utils.print_images import COLOR_MODE_COLOR, DEFAULT_PRINT_DPI, DEFAULT_PRINT_QUALITY
+from utils.receipt_fetch import DEFAULT_DEADLINE, FetchReport
+from utils.receipt_grid import get_page_size
+from utils.transaction_utils import pdf_buffer_value, sort_transactions_chronological
+
+DEFAULT_PAGES_PER_PART = 10
+MIN_PARALLEL_PAGES = 2 * DEFAULT_PAGES_PER_PART  # below this, process startup costs more than it saves
+
+
+def _render_part(
+    transactions: list[dict],
+    page_size: tuple[float, float],
+    heading_suffix: str,
+    images: Mapping[str, bytes] | None,
+    print_dpi: int | None,
+    print_quality: int,
+    color_mode: str,
+    end: float | None,
+) -> tuple[bytes, dict[str, str], dict[str, bytes]]:
+    """
+    Worker: render one page range to PDF bytes (fetching its own images when none are given).
+    end is the export-wide wall-clock (time.time()) limit for fetching, shared by every part.
+    Returns (pdf_bytes, {receipt_url: reason} for receipts drawn as placeholders,
+    {receipt_url: print-ready bytes} fetched here, empty when images were given).
+    """
+    deadline = None if end is None else max(0.0, end - time.time())
+    report = FetchReport()
+    fetched: dict[str, bytes] = {}
+    if images is None and print_dpi is not None:
+        fetched = export_receipt.fetch_print_images(
+            (t.get("receipt_url") or "" for t in transactions),
+            page_size,
+            print_dpi=print_dpi,
+            print_quality=print_quality,
+            color_mode=color_mode,
+            deadline=deadline,
+            report=report,
+        )
+        images, print_dpi = fetched, None
+    buf = BytesIO()
+    export_receipt.generate_receipts_pdf(
+        transactions,
+        output_buffer=buf,
+        page_size=page_size,
+        heading_suffix=heading_suffix,
+        images=images,
+        print_dpi=print_dpi,
+        print_quality=print_quality,
+        color_mode=color_mode,
+        deadline=deadline,
+        report=report,
+    )
+    return buf.getvalue(), report.failures, fetched
+
+
+def generate_receipts_pdf_parallel(
+    transactions: list[dict],
+    output_path: str | Path | None = None,
+    output_buffer: BinaryIO | None = None,
+    page_size: tuple[float, float] | None = None,
+    *,
+    heading_suffix: str = "",
+    images: Mapping[str, bytes] | None = None,
+    print_dpi: int | None = DEFAULT_PRINT_DPI,
+    print_quality: int = DEFAULT_PRINT_QUALITY,
+    color_mode: str = COLOR_MODE_COLOR,
+    deadline: float | None = DEFAULT_DEADLINE,
+    report: FetchReport | None = None,
+    processes: int | None = None,
+    pages_per_part: int = DEFAULT_PAGES_PER_PART,
+    prepared: dict[str, bytes] | None = None,
+) -> bytes | None:
+    """
+    Generate a receipts-only PDF, rendering page ranges in a process pool and merging in order.
+
+    Args and return value match export_receipt.generate_receipts_pdf, plus:
+        processes: Worker processes (default: CPU count).
+        pages_per_part: Receipt pages rendered per task; each part starts on a page boundary.
+        prepared: When given (and images is None), receives the print-ready {url: bytes}
+            fetched for the export, so other variants can be rendered without fetching again.
+
+    Falls back to the serial exporter when pypdf is missing, only one process is available,
+    or the export has fewer than MIN_PARALLEL_PAGES pages.
+
+    deadline bounds the whole export: every part fetches against the same end time, taken when
+    the pool starts, so parts queued behind others get what is left. Placeholders from every
+    part are collected into report.
+    """
+    size = page_size or get_page_size()
+    receipts = sort_transactions_chronological(
+        [t for t in transactions if (t.get("receipt_url") or "").strip()]
+    )
+    per_part = max(1, pages_per_part) * export_receipt.RECEIPTS_PER_PAGE
+    parts = [receipts[i : i + per_part] for i in range(0, len(receipts), per_part)]
+    n_pages = -(-len(receipts) // export_receipt.RECEIPTS_PER_PAGE)
+    workers = min(processes or os.cpu_count() or 1, len(parts))
+
+    if not HAS_PYPDF or workers <= 1 or n_pages < MIN_PARALLEL_PAGES:
+        if images is None and prepared is not None and print_dpi is not None:
+            images = export_receipt.fetch_print_images(
+                (t.get("receipt_url") or "" for t in receipts),
+                size,
+                print_dpi=print_dpi,
+                print_quality=print_quality,
+                color_mode=color_mode,
+                deadline=deadline,
+                report=report,
+            )
+            prepared.update(images)
+            print_dpi = None
+        return export_receipt.generate_receipts_pdf(
+            receipts,
+            output_path=output_path,
+            output_buffer=output_buffer,
+            page_size=size,
+            heading_suffix=heading_suffix,
+            images=images,
+            print_dpi=print_dpi,
+            print_quality=print_quality,
+            color_mode=color_mode,
+            deadline=deadline,
+            report=report,
+        )
+
+    def _images_for(part: list[dict]) -> dict[str, bytes] | None:
+        if images is None:
+            return None
+        urls = {(t.get("receipt_url") or "").strip() for t in part}
+        return {u: images[u] for u in urls if u in images}
+
+    # spawn: the parent may hold fetch thread pools, which do not survive fork safely
+    ctx = multiprocessing.get_context("spawn")
+    # Wall clock, not monotonic: the end time is compared in other processes.
+    end = None if deadline is None else time.time() + deadline
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [
+            pool.submit(
+                _render_part,
+                part,
+                size,
+                heading_suffix,
+                _images_for(part),
+                print_dpi,
+                print_quality,
+                color_mode,
+                end,
+            )
+            for part in parts
+        ]
+        writer = PdfWriter()
+        for future in futures:  # in submission order, so pages stay in date order
+            pdf, failures, fetched = future.result()
+            writer.append(PdfReader(BytesIO(pdf)))
+            if prepared is not None:
+                prepared.update(fetched)
+            if report is not None:
+                for url, reason in failures.items():
+                    report.fail(url, reason)
+
+    if output_buffer is not None:
+        writer.write(output_buffer)
+    else:
+        with open(output_path, "wb") as f:
+            writer.write(f)
+    return pdf_buffer_value(output_buffer)
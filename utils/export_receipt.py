@@ -1,18 +1,28 @@
 """
 Receipt-only PDF export: uses receipt_grid layout (heading, line, 3 sections of name row + image row).
 Draws receipt name in each name cell and receipt image in each image cell. Sorted by date. No statement.
+Receipt images are prefetched concurrently (utils.receipt_fetch) before any page is drawn, then
+cropped and resampled to the image cell at print resolution (utils.print_images). The static
+part of each page (heading, optional grid lines) is a form XObject drawn once per document.
+Image fetching is bounded by an export-wide deadline; receipts whose image is not ready get
+a visible placeholder with the file name and are listed in a receipt_fetch.FetchReport.
 
 Public API:
 - generate_receipts_pdf(): build receipts-only PDF to buffer or path.
 - draw_receipt_pages(): draw receipt pages onto an existing canvas (for statement+receipts).
+- image_box_size(): drawable (width, height) of an image cell, the target for print images.
+- fetch_print_images(): fetch + prepare receipt images in batches (bounded memory).
+- budget_print_images(): prepare receipt images to fit a byte budget (size-capped exports).
 """
 
 from __future__ import annotations
 
+import hashlib
+import time
 from datetime import date as date_type
 from io import BytesIO
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Mapping
 
 if TYPE_CHECKING:
     from reportlab.pdfgen.canvas import Canvas
@@ -22,23 +32,53 @@ try:
     from reportlab.pdfgen import canvas
     from reportlab.lib.utils import ImageReader
     from PIL import Image
-    import urllib.request
 
     HAS_REPORTLAB = True
 except ImportError:
     HAS_REPORTLAB = False
 
 from utils.receipt_grid import (
+    ReceiptGridGeometry,
     get_page_size,
-    get_receipt_grid_layout,
-    get_receipt_cell_rect,
+    get_receipt_grid_geometry,
     COLS,
     SECTIONS,
 )
-from utils.transaction_utils import receipt_filename_from_url, sort_transactions_chronological
+from utils.print_images import (
+    COLOR_MODE_COLOR,
+    DEFAULT_PRINT_DPI,
+    DEFAULT_PRINT_QUALITY,
+    embedded_size,
+    fit_print_images,
+    is_passthrough_jpeg,
+    prepare_print_images,
+)
+from utils.pdf_canvas import CanvasState
+from utils.receipt_fetch import (
+    DEFAULT_DEADLINE,
+    FAIL_ERROR,
+    FAIL_UNREADABLE,
+    CircuitBreaker,
+    FetchReport,
+    prefetch_images,
+    unique_urls,
+)
+from utils.text_fit import fit_text
+from utils.transaction_utils import (
+    pdf_buffer_value,
+    receipt_filename_from_url,
+    sort_transactions_chronological,
+)
 
 RECEIPTS_PER_PAGE = COLS * SECTIONS  # 15
+FETCH_BATCH_SIZE = 4 * RECEIPTS_PER_PAGE  # full-size originals held in memory at once
 _NAME_FONT_SIZE = 6
+_IMAGE_INSET = 1  # points of white border inside each image cell
+_GRID_LINE_GRAY = 0.75  # separator lines when grid_lines=True
+_GAP_BAND_GRAY = 0.94  # gap band fill when grid_lines=True
+_PLACEHOLDER_FILL = 0.93  # image cells whose image could not be loaded
+_PLACEHOLDER_INK = 0.35
+_IMAGE_OBJECT_BYTES = 512  # PDF bytes per embedded image besides its JPEG data (XObject dict, Do operator)
 
 
 def _receipt_name(t: dict) -> str:
@@ -64,15 +104,24 @@ def _receipt_name(t: dict) -> str:
     return user or "—"
 
 
-def _fetch_image_as_reader(url: str) -> ImageReader | None:
-    """Fetch image from URL and return a ReportLab ImageReader, or None on failure."""
-    if not HAS_REPORTLAB or not url:
+def _image_reader_from_bytes(data: bytes | None, *, prepared: bool = False) -> ImageReader | None:
+    """
+    Build a ReportLab ImageReader from image bytes, or None on failure.
+
+    prepared=True means data is already print-ready (utils.print_images). Baseline RGB or
+    grayscale JPEGs are embedded with their original DCT bytes; bilevel and grayscale PNGs
+    (gray / bilevel print modes) losslessly as 8-bit gray; anything else (color PNG, RGBA,
+    palette, CMYK, progressive) is decoded and re-encoded as JPEG.
+    """
+    if not HAS_REPORTLAB or not data:
         return None
     try:
-        with urllib.request.urlopen(url, timeout=10) as r:
-            data = r.read()
+        if is_passthrough_jpeg(data) or (prepared and data[:2] == b"\xff\xd8"):
+            return ImageReader(BytesIO(data))
         img = Image.open(BytesIO(data))
-        if img.mode in ("RGBA", "P"):
+        if img.format == "PNG" and img.mode in ("1", "L"):
+            return ImageReader(img.convert("L"))
+        if img.mode not in ("RGB", "L"):
             img = img.convert("RGB")
         buf = BytesIO()
         img.save(buf, format="JPEG", quality=100)
@@ -87,54 +136,45 @@ def _sort_by_date(transactions: list[dict]) -> list[dict]:
     return sort_transactions_chronological(transactions)
 
 
-def _truncate_to_width(c: "Canvas", text: str, max_width: float, font: str = "Helvetica", size: int = _NAME_FONT_SIZE) -> str:
-    """Return text truncated with … to fit max_width."""
-    if not text:
-        return text
-    if c.stringWidth(text, font, size) <= max_width:
-        return text
-    suffix = "…"
-    while len(text) > 1:
-        text = text[:-1]
-        if c.stringWidth(text + suffix, font, size) <= max_width:
-            return text + suffix
-    return suffix
-
-
-def _draw_receipt_name_in_cell(c: "Canvas", name: str, left: float, bottom: float, width: float, height: float) -> None:
+def _draw_receipt_name_in_cell(
+    r: CanvasState, name: str, left: float, bottom: float, width: float, height: float
+) -> None:
     """Draw receipt name in a name cell; truncate to fit width."""
-    c.setFont("Helvetica", _NAME_FONT_SIZE)
-    label = _truncate_to_width(c, name, width - 4)
+    r.set_fill_rgb(0, 0, 0)
+    r.set_font("Helvetica", _NAME_FONT_SIZE)
+    label = fit_text(name, width - 4, "Helvetica", _NAME_FONT_SIZE)
     # Baseline near top of cell, with small padding
     baseline = bottom + height - 4
-    c.drawString(left + 2, baseline, label)
+    r.c.drawString(left + 2, baseline, label)
 
 
 def _draw_receipt_image_in_cell(
     c: "Canvas",
-    url: str,
+    data: bytes | None,
     left: float,
     bottom: float,
     width: float,
     height: float,
-) -> None:
-    """Draw receipt image in cell; fill the box (cover) and clip to cell."""
-    ir = _fetch_image_as_reader(url) if url else None
+    *,
+    prepared: bool = False,
+) -> bool:
+    """Draw prefetched receipt image in cell; fill the box (cover) and clip to cell. False if not drawn."""
+    ir = _image_reader_from_bytes(data, prepared=prepared)
     if not ir:
-        return
+        return False
     try:
         iw, ih = ir.getSize()
         if not iw or not ih:
-            return
+            return False
 
         # Cover-fit into an inset rect so we leave a tiny white border.
-        inset = 1  # points
+        inset = _IMAGE_INSET
         draw_left = left + inset
         draw_bottom = bottom + inset
         draw_width = max(0, width - 2 * inset)
         draw_height = max(0, height - 2 * inset)
         if draw_width <= 0 or draw_height <= 0:
-            return
+            return False
 
         # Scale so the inset rect is fully filled, then clip overflow.
         scale = max(draw_width / iw, draw_height / ih)
@@ -148,8 +188,134 @@ def _draw_receipt_image_in_cell(
         c.clipPath(p, stroke=0, fill=0)
         c.drawImage(ir, img_x, img_y, width=draw_w, height=draw_h)
         c.restoreState()
+        return True
     except Exception:
-        pass
+        return False
+
+
+def _draw_image_placeholder(
+    r: CanvasState, name: str, left: float, bottom: float, width: float, height: float
+) -> None:
+    """
+    Shaded, dashed box with "Image unavailable" and the file name, for a receipt image that could not be loaded.
+    Colors and fonts go through r, so runs of placeholders do not repeat them.
+    """
+    inset = _IMAGE_INSET
+    if width <= 2 * inset or height <= 2 * inset:
+        return
+    c = r.c
+    r.set_fill_rgb(_PLACEHOLDER_FILL, _PLACEHOLDER_FILL, _PLACEHOLDER_FILL)
+    r.set_stroke_rgb(_PLACEHOLDER_INK, _PLACEHOLDER_INK, _PLACEHOLDER_INK)
+    c.saveState()  # dash and line width only; colors set above survive restoreState
+    c.setLineWidth(0.5)
+    c.setDash(3, 2)
+    c.rect(left + inset, bottom + inset, width - 2 * inset, height - 2 * inset, stroke=1, fill=1)
+    c.restoreState()
+    r.set_fill_rgb(_PLACEHOLDER_INK, _PLACEHOLDER_INK, _PLACEHOLDER_INK)
+    cx, cy = left + width / 2, bottom + height / 2
+    r.set_font("Helvetica-Bold", 7)
+    c.drawCentredString(cx, cy + 3, "Image unavailable")
+    r.set_font("Helvetica", _NAME_FONT_SIZE)
+    c.drawCentredString(cx, cy - 7, fit_text(name, width - 8, "Helvetica", _NAME_FONT_SIZE))
+
+
+def image_box_size(page_size: tuple[float, float]) -> tuple[float, float]:
+    """Return (width, height) in points of the drawable area of an image cell (inside the inset)."""
+    _, _, w, h = get_receipt_grid_geometry(page_size).image_rects[0]
+    return max(0, w - 2 * _IMAGE_INSET), max(0, h - 2 * _IMAGE_INSET)
+
+
+def fetch_print_images(
+    urls: Iterable[str],
+    page_size: tuple[float, float],
+    *,
+    print_dpi: int | None = DEFAULT_PRINT_DPI,
+    print_quality: int = DEFAULT_PRINT_QUALITY,
+    batch_size: int = FETCH_BATCH_SIZE,
+    max_bytes: int | None = None,
+    color_mode: str = COLOR_MODE_COLOR,
+    deadline: float | None = DEFAULT_DEADLINE,
+    report: FetchReport | None = None,
+) -> dict[str, bytes]:
+    """
+    Fetch receipt images concurrently and prepare them for print; return {url: bytes}.
+
+    URLs are fetched batch_size at a time and each batch's full-size originals are dropped as
+    soon as they are resampled, so memory holds at most one batch of originals. With
+    print_dpi=None all originals are fetched at once and returned as is.
+
+    max_bytes caps the total size of the prepared images: each batch gets its share of what is
+    left, and fit_print_images picks resolution and quality per image within it.
+    color_mode is one of print_images.COLOR_MODES (color JPEG, gray or bilevel PNG).
+
+    deadline bounds the whole call in seconds (all batches, fetch and prepare); one circuit
+    breaker is shared by all batches. URLs missing from the result are recorded in report
+    with the reason (receipt_fetch.FAIL_*).
+    """
+    urls = unique_urls(urls)
+    breaker = CircuitBreaker()
+    if print_dpi is None:
+        return prefetch_images(urls, deadline=deadline, breaker=breaker, report=report)
+    end = None if deadline is None else time.monotonic() + deadline
+    box_w, box_h = image_box_size(page_size)
+    prepared: dict[str, bytes] = {}
+    for offset in range(0, len(urls), max(1, batch_size)):
+        batch = urls[offset : offset + batch_size]
+        remaining = None if end is None else max(0.0, end - time.monotonic())
+        originals = prefetch_images(batch, deadline=remaining, breaker=breaker, report=report)
+        if max_bytes is None:
+            prepared.update(prepare_print_images(
+                originals, box_w, box_h, dpi=print_dpi, quality=print_quality, color_mode=color_mode
+            ))
+        else:
+            remaining_bytes = max_bytes - sum(embedded_size(data) for data in prepared.values())
+            share = max(0, remaining_bytes) * len(batch) // (len(urls) - offset)
+            prepared.update(fit_print_images(
+                originals, box_w, box_h, share, dpi=print_dpi, quality=print_quality, color_mode=color_mode
+            ))
+        if report is not None:
+            for url in originals:
+                if url not in prepared:
+                    report.fail(url, FAIL_UNREADABLE)
+    return prepared
+
+
+def budget_print_images(
+    transactions: list[dict],
+    page_size: tuple[float, float],
+    max_bytes: int,
+    *,
+    images: Mapping[str, bytes] | None = None,
+    print_dpi: int | None = DEFAULT_PRINT_DPI,
+    print_quality: int = DEFAULT_PRINT_QUALITY,
+    color_mode: str = COLOR_MODE_COLOR,
+    deadline: float | None = DEFAULT_DEADLINE,
+    report: FetchReport | None = None,
+) -> dict[str, bytes]:
+    """
+    Prepare the receipt images of transactions so that, embedded, they take at most max_bytes.
+
+    max_bytes is the PDF budget left for images (the caller subtracts text and layout). images
+    are full-size originals, fetched in batches when None (within deadline, failures recorded
+    in report). Images are prepared in page order.
+    """
+    urls = unique_urls(t.get("receipt_url") or "" for t in sort_transactions_chronological(transactions))
+    budget = max(0, max_bytes - len(urls) * _IMAGE_OBJECT_BYTES)
+    dpi = print_dpi or DEFAULT_PRINT_DPI
+    if images is None:
+        return fetch_print_images(
+            urls,
+            page_size,
+            print_dpi=dpi,
+            print_quality=print_quality,
+            max_bytes=budget,
+            color_mode=color_mode,
+            deadline=deadline,
+            report=report,
+        )
+    box_w, box_h = image_box_size(page_size)
+    originals = {u: images[u] for u in urls if u in images}
+    return fit_print_images(originals, box_w, box_h, budget, dpi=dpi, quality=print_quality, color_mode=color_mode)
 
 
 def _with_receipts_only(transactions: list[dict]) -> list[dict]:
@@ -157,34 +323,64 @@ def _with_receipts_only(transactions: list[dict]) -> list[dict]:
     return [t for t in transactions if (t.get("receipt_url") or "").strip()]
 
 
+def _page_template_name(grid: ReceiptGridGeometry, heading: str, grid_lines: bool) -> str:
+    """Form XObject name, unique per page size, density, heading and decoration."""
+    key = f"{grid.page_w:.2f}x{grid.page_h:.2f}/{grid.cols}x{grid.sections}/{grid_lines}/{heading}"
+    return "ReceiptPage" + hashlib.md5(key.encode("utf-8")).hexdigest()[:8]
+
+
+def _draw_receipt_page_template(c: "Canvas", grid: ReceiptGridGeometry, heading: str, grid_lines: bool) -> None:
+    """Static layer of every receipt page: heading, plus gap bands and separator lines when grid_lines."""
+    r = CanvasState(c)
+    if grid_lines:
+        r.set_fill_rgb(_GAP_BAND_GRAY, _GAP_BAND_GRAY, _GAP_BAND_GRAY)
+        for left, bottom, width, height in grid.gap_rects:
+            c.rect(left, bottom, width, height, stroke=0, fill=1)
+        r.set_stroke_rgb(_GRID_LINE_GRAY, _GRID_LINE_GRAY, _GRID_LINE_GRAY)
+        c.setLineWidth(grid.line_pt)
+        r.draw_lines(grid.separator_lines)
+    r.set_fill_rgb(0, 0, 0)
+    r.set_font("Helvetica-Bold", 12)
+    c.drawString(grid.margin, grid.page_h - grid.margin - 14, heading)
+
+
 def _draw_one_receipt_page(
-    c: "Canvas",
+    r: CanvasState,
     transactions: list[dict],
     page_size: tuple[float, float],
+    images: Mapping[str, bytes],
     *,
     heading_suffix: str = "",
+    prepared: bool = False,
+    grid_lines: bool = False,
+    report: FetchReport | None = None,
 ) -> None:
-    """Draw one page: heading, then up to 15 receipts in grid cells (white background, no grid lines)."""
-    layout = get_receipt_grid_layout(page_size)
-    m = layout["margin"]
+    """
+    Draw one page: the page template (heading, optional grid), then up to 15 receipts in grid cells.
 
-    # Heading (no lines; white grid)
-    c.setFont("Helvetica-Bold", 12)
+    The template is a form XObject defined on the first page and referenced by the rest, so
+    only names and images are drawn per page. A receipt whose image is missing or unreadable
+    gets a placeholder with its file name, and is recorded in report.
+    """
+    grid = get_receipt_grid_geometry(page_size)
     heading = "Receipts"
     if heading_suffix:
         heading = f"{heading} — {heading_suffix}"
-    c.drawString(m, layout["page_h"] - m - 14, heading)
+    r.draw_form(
+        _page_template_name(grid, heading, grid_lines),
+        lambda c: _draw_receipt_page_template(c, grid, heading, grid_lines),
+    )
 
     # Fill name and image cells for each receipt
-    for idx, t in enumerate(transactions):
-        if idx >= RECEIPTS_PER_PAGE:
-            break
-        section = idx // COLS
-        col = idx % COLS
-        left_n, bottom_n, w_n, h_n = get_receipt_cell_rect(section, col, "name", page_size)
-        left_i, bottom_i, w_i, h_i = get_receipt_cell_rect(section, col, "image", page_size)
-        _draw_receipt_name_in_cell(c, _receipt_name(t), left_n, bottom_n, w_n, h_n)
-        _draw_receipt_image_in_cell(c, (t.get("receipt_url") or "").strip(), left_i, bottom_i, w_i, h_i)
+    for t, name_rect, image_rect in zip(transactions[: grid.slots], grid.name_rects, grid.image_rects):
+        name = _receipt_name(t)
+        _draw_receipt_name_in_cell(r, name, *name_rect)
+        url = (t.get("receipt_url") or "").strip()
+        data = images.get(url)
+        if not _draw_receipt_image_in_cell(r.c, data, *image_rect, prepared=prepared):
+            _draw_image_placeholder(r, name, *image_rect)
+            if report is not None:
+                report.fail(url, FAIL_UNREADABLE if data else FAIL_ERROR)
 
 
 def draw_receipt_pages(
@@ -194,30 +390,95 @@ def draw_receipt_pages(
     receipts_per_page: int = RECEIPTS_PER_PAGE,
     *,
     heading_suffix: str = "",
+    images: Mapping[str, bytes] | None = None,
+    print_dpi: int | None = DEFAULT_PRINT_DPI,
+    print_quality: int = DEFAULT_PRINT_QUALITY,
+    color_mode: str = COLOR_MODE_COLOR,
+    grid_lines: bool = False,
+    deadline: float | None = DEFAULT_DEADLINE,
+    report: FetchReport | None = None,
 ) -> None:
     """
     Draw receipt pages onto an existing canvas using receipt_grid layout.
     Only transactions with receipt_url are printed, sorted by date first.
+    grid_lines=True adds the grid's separator lines and gap bands (drawn once, in the page template).
+
+    images maps receipt_url -> image bytes. When None, all receipt images are prefetched
+    concurrently (fetch_print_images) before the first page is drawn, within deadline seconds.
+    Receipts whose image is missing from the mapping (or unreadable) get a placeholder with the
+    file name; report, when given, receives the URL and the reason (receipt_fetch.FAIL_*).
+
+    Each image is cropped to the cell's cover box and resampled to print_dpi (JPEG at
+    print_quality, or a lossless gray / bilevel PNG per color_mode) before embedding.
+    print_dpi=None embeds the full-size image.
+    Images fetched or prepared here are released as soon as their page is drawn; a mapping
+    passed in by the caller is left untouched.
     """
     with_receipts = _with_receipts_only(transactions)
     if not with_receipts:
         return
     sorted_tx = sort_transactions_chronological(with_receipts)
-
+    prepared = print_dpi is not None
+    owned = True  # images built here can be released page by page
+    if images is None:
+        images = fetch_print_images(
+            (t.get("receipt_url") or "" for t in sorted_tx),
+            page_size,
+            print_dpi=print_dpi,
+            print_quality=print_quality,
+            color_mode=color_mode,
+            deadline=deadline,
+            report=report,
+        )
+    elif prepared:
+        box_w, box_h = image_box_size(page_size)
+        images = prepare_print_images(
+            images, box_w, box_h, dpi=print_dpi, quality=print_quality, color_mode=color_mode
+        )
+    else:
+        owned = False
+    # Offset of the last page that uses each URL (one receipt file may back several rows)
+    last_offset = {
+        (t.get("receipt_url") or "").strip(): i - i % receipts_per_page for i, t in enumerate(sorted_tx)
+    }
+
+    r = CanvasState(c)
     for offset in range(0, len(sorted_tx), receipts_per_page):
         if offset > 0:
-            c.showPage()
+            r.show_page()
         chunk = sorted_tx[offset : offset + receipts_per_page]
-        _draw_one_receipt_page(c, chunk, page_size, heading_suffix=heading_suffix)
+        _draw_one_receipt_page(
+            r,
+            chunk,
+            page_size,
+            images,
+            heading_suffix=heading_suffix,
+            prepared=prepared,
+            grid_lines=grid_lines,
+            report=report,
+        )
+        if owned:
+            for t in chunk:
+                url = (t.get("receipt_url") or "").strip()
+                if last_offset.get(url) == offset:
+                    images.pop(url, None)
 
 
 def generate_receipts_pdf(
     transactions: list[dict],
     output_path: str | Path | None = None,
-    output_buffer: BytesIO | None = None,
+    output_buffer: BinaryIO | None = None,
     page_size: tuple[float, float] | None = None,
     *,
     heading_suffix: str = "",
+    images: Mapping[str, bytes] | None = None,
+    print_dpi: int | None = DEFAULT_PRINT_DPI,
+    print_quality: int = DEFAULT_PRINT_QUALITY,
+    max_bytes: int | None = None,
+    color_mode: str = COLOR_MODE_COLOR,
+    grid_lines: bool = False,
+    deadline: float | None = DEFAULT_DEADLINE,
+    report: FetchReport | None = None,
 ) -> bytes | None:
     """
     Generate a receipts-only PDF using receipt_grid (heading, 3 sections of name+image rows per page).
@@ -225,18 +486,54 @@ def generate_receipts_pdf(
     Args:
         transactions: List of dicts with date, receipt_url, user, etc.
         output_path: Write PDF here (mutually exclusive with output_buffer).
-        output_buffer: Write PDF bytes here (mutually exclusive with output_path).
+        output_buffer: Write PDF bytes to this binary file, e.g. BytesIO or a spooled temp file
+            (mutually exclusive with output_path).
         page_size: A4 if not specified.
+        images: Prefetched {receipt_url: bytes}; fetched concurrently when None.
+        print_dpi: Resample images to this resolution for their cell; None keeps full size.
+        print_quality: JPEG quality of the resampled images.
+        max_bytes: Target size of the whole PDF. The pages are first rendered without images
+            to measure the layout; the rest of the budget is split across the images
+            (budget_print_images). Images never drop below a legible floor
+            (print_images.BUDGET_MIN_DPI / BUDGET_MIN_QUALITY), so a very small budget can be exceeded.
+        color_mode: print_images.COLOR_MODE_COLOR (JPEG), COLOR_MODE_GRAY or COLOR_MODE_BILEVEL
+            (lossless, several times smaller for text receipts).
+        grid_lines: Draw the grid's separator lines and gap bands (default: white grid).
+        deadline: Seconds allowed for fetching and preparing images; receipts not ready by then
+            get a placeholder with their file name, so the PDF is produced in bounded time.
+        report: receipt_fetch.FetchReport that receives {receipt_url: reason} for every receipt
+            drawn as a placeholder.
 
     Returns:
-        PDF bytes if output_buffer was provided, else None.
+        PDF bytes if output_buffer is a BytesIO, else None.
     """
     if not HAS_REPORTLAB:
         raise RuntimeError("Install reportlab and Pillow for PDF export: pip install reportlab pillow")
 
     size = page_size or get_page_size()
+    if max_bytes is not None:
+        receipts = _with_receipts_only(transactions)
+        layout = generate_receipts_pdf(receipts, output_buffer=BytesIO(), page_size=size,
+                                       heading_suffix=heading_suffix, images={}, grid_lines=grid_lines)
+        images = budget_print_images(receipts, size, max_bytes - len(layout), images=images,
+                                     print_dpi=print_dpi, print_quality=print_quality, color_mode=color_mode,
+                                     deadline=deadline, report=report)
+        print_dpi = None
     dest = output_buffer if output_buffer is not None else str(output_path)
     c = canvas.Canvas(dest, pagesize=size)
-    draw_receipt_pages(c, transactions, size, RECEIPTS_PER_PAGE, heading_suffix=heading_suffix)
+    draw_receipt_pages(
+        c,
+        transactions,
+        size,
+        RECEIPTS_PER_PAGE,
+        heading_suffix=heading_suffix,
+        images=images,
+        print_dpi=print_dpi,
+        print_quality=print_quality,
+        color_mode=color_mode,
+        grid_lines=grid_lines,
+        deadline=deadline,
+        report=report,
+    )
     c.save()
-    return output_buffer.getvalue() if output_buffer is not None else None
+    return pdf_buffer_value(output_buffer)
@@ -0,0 +1,222 @@
+"""
+Export session: one prepared dataset for every PDF variant of a statement.
+
+The print section offers three downloads (statement only, statement + receipts, receipts only).
+An ExportSession sorts and filters the rows once, fetches and prepares each receipt image once
+(utils.receipt_fetch + utils.print_images), and renders any subset of variants from that state,
+so image cost scales with the number of receipts rather than receipts × variants.
+
+For large exports, render_to_file() writes the PDF to a spooled temp file (in memory up to
+SPOOL_MAX_BYTES, then on disk) and iter_file_chunks() streams it out, so no PDF is held as
+a bytes object. Images are fetched in batches and only print-size copies are kept.
+With max_bytes, images are sized so each rendered PDF fits that budget (e.g. a mail size limit);
+color_mode picks color, grayscale or black & white receipt images (utils.print_images).
+Image fetching gets deadline seconds in total; receipts not ready by then are drawn as
+placeholders and listed in session.report (utils.receipt_fetch.FetchReport).
+When the receipts-only variant of an export with MIN_PARALLEL_PAGES or more pages is rendered
+before the images are prepared, it is fetched, resampled and rendered across a process pool
+(utils.export_parallel), and the images it prepared are kept for the other variants.
+
+Public API:
+- ExportSession: shared rows + prepared images; render() / render_variants() / render_to_file().
+- iter_file_chunks(): yield a rendered file in fixed-size chunks.
+- VARIANTS: (VARIANT_STATEMENT, VARIANT_STATEMENT_RECEIPTS, VARIANT_RECEIPTS).
+"""
+
+from __future__ import annotations
+
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+from utils import export_receipt, export_statement
+from utils.export_parallel import MIN_PARALLEL_PAGES, generate_receipts_pdf_parallel
+from utils.print_images import COLOR_MODE_COLOR, DEFAULT_PRINT_DPI, DEFAULT_PRINT_QUALITY
+from utils.receipt_fetch import DEFAULT_DEADLINE, FetchReport
+from utils.receipt_grid import get_page_size
+from utils.transaction_utils import sort_transactions_chronological
+
+VARIANT_STATEMENT = "statement"
+VARIANT_STATEMENT_RECEIPTS = "statement_receipts"
+VARIANT_RECEIPTS = "receipts"
+VARIANTS = (VARIANT_STATEMENT, VARIANT_STATEMENT_RECEIPTS, VARIANT_RECEIPTS)
+
+SPOOL_MAX_BYTES = 8 * 1024 * 1024  # rendered PDFs larger than this go to disk
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+class ExportSession:
+    """Rows and receipt images for one (month, user) export, shared by all PDF variants."""
+
+    def __init__(
+        self,
+        transactions: list[dict],
+        *,
+        currency: str = "$",
+        month_label: str = "",
+        user_name: str = "",
+        page_size: tuple[float, float] | None = None,
+        print_dpi: int | None = DEFAULT_PRINT_DPI,
+        print_quality: int = DEFAULT_PRINT_QUALITY,
+        max_bytes: int | None = None,
+        color_mode: str = COLOR_MODE_COLOR,
+        deadline: float | None = DEFAULT_DEADLINE,
+        processes: int | None = None,
+    ) -> None:
+        self.transactions = sort_transactions_chronological(transactions)
+        self.receipts = [t for t in self.transactions if (t.get("receipt_url") or "").strip()]
+        self.currency = currency
+        self.month_label = month_label
+        self.user_name = user_name
+        self.page_size = page_size or get_page_size()
+        self.print_dpi = print_dpi
+        self.print_quality = print_quality
+        self.max_bytes = max_bytes
+        self.color_mode = color_mode
+        self.deadline = deadline
+        self.processes = processes  # for the parallel receipts render (default: CPU count)
+        self.report = FetchReport()  # receipts rendered as placeholders, and why
+        self._images: dict[str, bytes] | None = None
+
+    @property
+    def images(self) -> dict[str, bytes]:
+        """
+        Prepared {receipt_url: bytes} for every receipt; fetched and prepared on first use.
+
+        With max_bytes, images are fitted to what the statement + receipts layout leaves of the
+        budget, so every variant stays within max_bytes.
+        """
+        if self._images is None and self.max_bytes is not None:
+            layout = export_statement.generate_receipts_pdf(
+                self.transactions,
+                output_buffer=BytesIO(),
+                currency=self.currency,
+                statement_month_label=self.month_label,
+                statement_user_name=self.user_name,
+                images={},
+            )
+            self._images = export_receipt.budget_print_images(
+                self.receipts,
+                self.page_size,
+                self.max_bytes - len(layout),
+                print_dpi=self.print_dpi,
+                print_quality=self.print_quality,
+                color_mode=self.color_mode,
+                deadline=self.deadline,
+                report=self.report,
+            )
+        elif self._images is None:
+            self._images = export_receipt.fetch_print_images(
+                (t.get("receipt_url") or "" for t in self.receipts),
+                self.page_size,
+                print_dpi=self.print_dpi,
+                print_quality=self.print_quality,
+                color_mode=self.color_mode,
+                deadline=self.deadline,
+                report=self.report,
+            )
+        return self._images
+
+    def render(
+        self,
+        variant: str,
+        output_path: str | Path | None = None,
+        output_buffer: BinaryIO | None = None,
+    ) -> bytes | None:
+        """
+        Render one variant (VARIANT_STATEMENT, VARIANT_STATEMENT_RECEIPTS or VARIANT_RECEIPTS).
+
+        With neither output_path nor output_buffer, returns the PDF bytes; otherwise writes
+        there and returns None (bytes are still returned for a BytesIO output_buffer). Images are already
+        prepared, so the generators are called with print_dpi=None and embed them as is.
+        """
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown export variant: {variant!r}")
+        buf = output_buffer
+        if buf is None and output_path is None:
+            buf = BytesIO()
+
+        n_pages = -(-len(self.receipts) // export_receipt.RECEIPTS_PER_PAGE)
+        if (
+            variant == VARIANT_RECEIPTS
+            and n_pages >= MIN_PARALLEL_PAGES
+            and self._images is None
+            and self.max_bytes is None
+            and self.print_dpi is not None
+        ):
+            # Workers fetch and resample their own pages' images (the bulk of the work) and
+            # hand them back, so later variants reuse them.
+            prepared: dict[str, bytes] = {}
+            generate_receipts_pdf_parallel(
+                self.receipts,
+                output_path=output_path,
+                output_buffer=buf,
+                page_size=self.page_size,
+                heading_suffix=self.month_label,
+                print_dpi=self.print_dpi,
+                print_quality=self.print_quality,
+                color_mode=self.color_mode,
+                deadline=self.deadline,
+                report=self.report,
+                processes=self.processes,
+                prepared=prepared,
+            )
+            self._images = prepared
+        elif variant == VARIANT_RECEIPTS:
+            export_receipt.generate_receipts_pdf(
+                self.receipts,
+                output_path=output_path,
+                output_buffer=buf,
+                page_size=self.page_size,
+                heading_suffix=self.month_label,
+                images=self.images,
+                print_dpi=None,
+                report=self.report,
+            )
+        else:
+            include_receipts = variant == VARIANT_STATEMENT_RECEIPTS
+            export_statement.generate_receipts_pdf(
+                self.transactions,
+                output_path=output_path,
+                output_buffer=buf,
+                currency=self.currency,
+                include_receipts=include_receipts,
+                include_statement=True,
+                statement_month_label=self.month_label,
+                statement_user_name=self.user_name,
+                images=self.images if include_receipts else None,
+                print_dpi=None,
+                report=self.report,
+            )
+        return buf.getvalue() if isinstance(buf, BytesIO) else None
+
+    def render_variants(self, variants: Iterable[str] = VARIANTS) -> dict[str, bytes]:
+        """Render each requested variant to bytes; return {variant: pdf_bytes}."""
+        return {variant: self.render(variant) for variant in variants}
+
+    def render_to_file(self, variant: str, max_memory: int = SPOOL_MAX_BYTES) -> BinaryIO:
+        """
+        Render one variant into a spooled temp file and return it positioned at the start.
+
+        Small PDFs stay in memory; larger ones roll over to disk. The caller owns the file
+        and should close it (the data is deleted on close).
+        """
+        f = tempfile.SpooledTemporaryFile(max_size=max_memory, mode="w+b", suffix=".pdf")
+        try:
+            self.render(variant, output_buffer=f)
+        except BaseException:
+            f.close()
+            raise
+        f.seek(0)
+        return f
+
+
+def iter_file_chunks(f: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the contents of f from the start in chunks of chunk_size bytes."""
+    f.seek(0)
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
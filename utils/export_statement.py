@@ -12,7 +12,7 @@ from __future__ import annotations
 from datetime import date
 from io import BytesIO
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, BinaryIO, Mapping
 
 if TYPE_CHECKING:
     from reportlab.pdfgen.canvas import Canvas
@@ -27,7 +27,16 @@ try:
 except ImportError:
     HAS_REPORTLAB = False
 
-from utils.transaction_utils import receipt_filename_from_url, sort_transactions_chronological
+from utils.pdf_canvas import CanvasState
+from utils.print_images import COLOR_MODE_COLOR, DEFAULT_PRINT_DPI
+from utils.receipt_fetch import DEFAULT_DEADLINE, FetchReport
+from utils.text_fit import fit_text, text_width
+from utils.transaction_frame import TransactionFrame
+from utils.transaction_utils import (
+    pdf_buffer_value,
+    receipt_filename_from_url,
+    sort_transactions_chronological,
+)
 
 # -----------------------------------------------------------------------------
 # Statement table layout
@@ -51,7 +60,7 @@ _CELL_PAD = 5  # pt from cell edge to text
 _TOTAL_GAP = 22  # pt below table before total line
 
 def _draw_table_cell(
-    c: "Canvas",
+    r: CanvasState,
     row_y: float,
     x: float,
     width: float,
@@ -63,17 +72,14 @@ def _draw_table_cell(
     """Draw one table cell; row_y is the logical top of the row (text drawn below)."""
     font_name = "Helvetica-Bold" if bold else "Helvetica"
     font_size = _TABLE_HEADER_FONT_SIZE if bold else _TABLE_FONT_SIZE
-    c.setFont(font_name, font_size)
-    max_ch = max(6, int((width - 2 * _CELL_PAD) / (font_size * 0.5)))
-    if len(text) > max_ch:
-        text = text[: max_ch - 1] + "…"
-    text = text or "—"
+    r.set_font(font_name, font_size)
+    text = fit_text(text or "—", width - 2 * _CELL_PAD, font_name, font_size)
     if align_right:
-        tw = c.stringWidth(text, font_name, font_size)
+        tw = text_width(text, font_name, font_size)
         cell_x = x + width - _CELL_PAD - tw
     else:
         cell_x = x + _CELL_PAD
-    c.drawString(cell_x, row_y - font_size - 2, text)
+    r.c.drawString(cell_x, row_y - font_size - 2, text)
 
 
 def _filename_from_receipt_url(url: str) -> str:
@@ -102,7 +108,7 @@ def _statement_table_top_y(page_height: float, user_name: str) -> float:
 
 
 def _draw_statement_heading(
-    c: "Canvas",
+    r: CanvasState,
     page_height: float,
     month_label: str,
     user_name: str,
@@ -110,44 +116,62 @@ def _draw_statement_heading(
     """Draw title and user line; return y of table top (below the heading block)."""
     margin = _TABLE_MARGIN
     baseline = page_height - 2 * margin - _HEADING_TOP_OFFSET
-    c.setFont("Helvetica-Bold", _HEADING_TITLE_SIZE)
+    r.set_font("Helvetica-Bold", _HEADING_TITLE_SIZE)
     title = f"Statement for {month_label}" if month_label else "Statement"
-    c.drawString(margin, baseline, title)
+    r.c.drawString(margin, baseline, title)
     if user_name:
-        c.setFont("Helvetica", _HEADING_SUB_SIZE)
-        c.drawString(margin, baseline - _HEADING_TITLE_TO_USER, f"User: {user_name}")
+        r.set_font("Helvetica", _HEADING_SUB_SIZE)
+        r.c.drawString(margin, baseline - _HEADING_TITLE_TO_USER, f"User: {user_name}")
     return _statement_table_top_y(page_height, user_name)
 
 
-def _draw_statement_table_grid(
-    c: "Canvas",
+def _table_grid_lines(
     x_start: float,
     table_top_y: float,
     y_bottom: float,
     n_rows: int,
-) -> None:
-    """Draw horizontal and vertical lines for one table page."""
+) -> list[tuple[float, float, float, float]]:
+    """Return (x1, y1, x2, y2) for every row and column boundary of one table page."""
     total_w = sum(_TABLE_COL_WIDTHS)
+    lines = []
     for i in range(2 + n_rows):
         yy = table_top_y - i * _TABLE_ROW_HEIGHT
-        c.line(x_start, yy, x_start + total_w, yy)
-    for col_i in range(len(_TABLE_COL_WIDTHS) + 1):
-        x = x_start + sum(_TABLE_COL_WIDTHS[:col_i])
-        c.line(x, y_bottom, x, table_top_y)
+        lines.append((x_start, yy, x_start + total_w, yy))
+    x = x_start
+    for w in (0, *_TABLE_COL_WIDTHS):
+        x += w
+        lines.append((x, y_bottom, x, table_top_y))
+    return lines
 
 
-def _draw_statement_header_row(c: "Canvas", x_start: float, table_top_y: float) -> None:
+def _draw_statement_table_grid(
+    r: CanvasState,
+    x_start: float,
+    table_top_y: float,
+    y_bottom: float,
+    n_rows: int,
+) -> None:
+    """
+    Draw horizontal and vertical lines for one table page as a single path inside a form XObject.
+    Pages with the same table position and row count (all full pages) share one form.
+    """
+    lines = _table_grid_lines(x_start, table_top_y, y_bottom, n_rows)
+    name = f"StatementGrid{n_rows}x{round(table_top_y * 100)}"
+    r.draw_form(name, lambda c: CanvasState(c).draw_lines(lines))
+
+
+def _draw_statement_header_row(r: CanvasState, x_start: float, table_top_y: float) -> None:
     """Draw the header row (Date, Description, Category, Amount, Receipt)."""
     header_baseline_y = table_top_y - _TABLE_ROW_HEIGHT + 10
     header_row_y = header_baseline_y + _TABLE_HEADER_FONT_SIZE + 2
     xx = x_start
     for i, (header, w) in enumerate(zip(_TABLE_HEADERS, _TABLE_COL_WIDTHS)):
-        _draw_table_cell(c, header_row_y, xx, w, header, bold=True, align_right=(i == 3))
+        _draw_table_cell(r, header_row_y, xx, w, header, bold=True, align_right=(i == 3))
         xx += w
 
 
 def _draw_statement_data_rows(
-    c: "Canvas",
+    r: CanvasState,
     x_start: float,
     table_top_y: float,
     transactions: list[dict],
@@ -159,24 +183,23 @@ def _draw_statement_data_rows(
         cells = _transaction_to_cells(t, currency)
         xx = x_start
         for i, (cell, w) in enumerate(zip(cells, _TABLE_COL_WIDTHS)):
-            _draw_table_cell(c, row_y, xx, w, cell, align_right=(i == 3))
+            _draw_table_cell(r, row_y, xx, w, cell, align_right=(i == 3))
             xx += w
 
 
 def _draw_statement_total(
-    c: "Canvas",
+    r: CanvasState,
     x_start: float,
     y_bottom: float,
-    transactions: list[dict],
+    total: float,
     currency: str,
 ) -> None:
     """Draw the total line below the table."""
-    total = sum(float(t.get("amount") or 0) for t in transactions)
-    c.setFont("Helvetica-Bold", _TABLE_FONT_SIZE)
+    r.set_font("Helvetica-Bold", _TABLE_FONT_SIZE)
     total_text = f"Total: {currency}{total:,.2f}"
-    tw = c.stringWidth(total_text, "Helvetica-Bold", _TABLE_FONT_SIZE)
+    tw = text_width(total_text, "Helvetica-Bold", _TABLE_FONT_SIZE)
     amount_col_right = x_start + sum(_TABLE_COL_WIDTHS[:4])
-    c.drawString(amount_col_right - tw - _CELL_PAD, y_bottom - _TOTAL_GAP, total_text)
+    r.c.drawString(amount_col_right - tw - _CELL_PAD, y_bottom - _TOTAL_GAP, total_text)
 
 
 def _draw_statement_pages(
@@ -187,13 +210,15 @@ def _draw_statement_pages(
     month_label: str = "",
     user_name: str = "",
 ) -> None:
-    """Draw statement table across one or more pages."""
+    """Draw statement table across one or more pages (font and form state tracked by CanvasState)."""
+    r = CanvasState(c)
+    amounts = TransactionFrame(transactions).amounts()
     page_width, page_height = page_size
     margin = _TABLE_MARGIN
     x_start = margin
     total_table_w = sum(_TABLE_COL_WIDTHS)
 
-    table_top_y = _draw_statement_heading(c, page_height, month_label, user_name)
+    table_top_y = _draw_statement_heading(r, page_height, month_label, user_name)
     available_height = table_top_y - margin - 2 * _TABLE_ROW_HEIGHT
     rows_per_page = max(1, int(available_height / _TABLE_ROW_HEIGHT))
 
@@ -203,14 +228,14 @@ def _draw_statement_pages(
         n_rows = len(chunk)
         y_bottom = table_top_y - (1 + n_rows) * _TABLE_ROW_HEIGHT
 
-        _draw_statement_table_grid(c, x_start, table_top_y, y_bottom, n_rows)
-        _draw_statement_header_row(c, x_start, table_top_y)
-        _draw_statement_data_rows(c, x_start, table_top_y, chunk, currency)
-        _draw_statement_total(c, x_start, y_bottom, chunk, currency)
+        _draw_statement_table_grid(r, x_start, table_top_y, y_bottom, n_rows)
+        _draw_statement_header_row(r, x_start, table_top_y)
+        _draw_statement_data_rows(r, x_start, table_top_y, chunk, currency)
+        _draw_statement_total(r, x_start, y_bottom, float(amounts[offset : offset + n_rows].sum()), currency)
 
         offset += len(chunk)
         if offset < len(transactions):
-            c.showPage()
+            r.show_page()
             # Continuation page: no heading redraw, just position table
             table_top_y = _statement_table_top_y(page_height, user_name)
             available_height = table_top_y - margin - 2 * _TABLE_ROW_HEIGHT
@@ -225,7 +250,7 @@ def _sort_chronological(transactions: list[dict]) -> list[dict]:
 def generate_receipts_pdf(
     transactions: list[dict],
     output_path: str | Path | None = None,
-    output_buffer: BytesIO | None = None,
+    output_buffer: BinaryIO | None = None,
     receipts_per_page: int = 15,
     page_size: tuple[float, float] | None = None,
     currency: str = "$",
@@ -233,6 +258,12 @@ def generate_receipts_pdf(
     include_statement: bool = True,
     statement_month_label: str = "",
     statement_user_name: str = "",
+    images: Mapping[str, bytes] | None = None,
+    print_dpi: int | None = DEFAULT_PRINT_DPI,
+    max_bytes: int | None = None,
+    color_mode: str = COLOR_MODE_COLOR,
+    deadline: float | None = DEFAULT_DEADLINE,
+    report: FetchReport | None = None,
 ) -> bytes | None:
     """
     Generate a PDF with optional statement table and/or receipt pages (receipts via utils.export_receipt).
@@ -242,7 +273,8 @@ def generate_receipts_pdf(
     Args:
         transactions: List of dicts with date, user, category, amount, description, receipt_url.
         output_path: Write PDF to this path (mutually exclusive with output_buffer).
-        output_buffer: Write PDF bytes here (mutually exclusive with output_path).
+        output_buffer: Write PDF bytes to this binary file, e.g. BytesIO or a spooled temp file
+            (mutually exclusive with output_path).
         receipts_per_page: Receipt thumbnails per page (default 15 for grid 3 sections × 5 cols).
         page_size: Page size in points; default letter for statement-only, A4 when receipts included.
         currency: Symbol for amounts (e.g. "$", "¥").
@@ -250,15 +282,33 @@ def generate_receipts_pdf(
         include_receipts: If True, include receipt pages (from utils.export_receipt).
         statement_month_label: Heading text e.g. "March 2026".
         statement_user_name: Heading text e.g. "user-1" or "All users".
+        images: Prefetched {receipt_url: bytes} for receipt pages; fetched concurrently when None.
+        print_dpi: Resolution receipt images are resampled to; None embeds them full size.
+        max_bytes: Target size of the whole PDF; receipt images share what the statement and
+            receipt layout leave (see export_receipt.generate_receipts_pdf).
+        color_mode: Receipt image mode, one of print_images.COLOR_MODES (color, gray, bilevel).
+        deadline: Seconds allowed for fetching receipt images; later ones become placeholders.
+        report: receipt_fetch.FetchReport receiving the receipts drawn as placeholders and why.
 
     Returns:
-        PDF bytes if output_buffer was provided, else None.
+        PDF bytes if output_buffer is a BytesIO, else None.
     """
     if not HAS_REPORTLAB:
         raise RuntimeError("Install reportlab and Pillow for PDF export: pip install reportlab pillow")
 
     sorted_tx = _sort_chronological(transactions)
     effective_page_size = A4 if include_receipts else (page_size or letter)
+    if max_bytes is not None and include_receipts:
+        layout = generate_receipts_pdf(
+            sorted_tx, output_buffer=BytesIO(), receipts_per_page=receipts_per_page, currency=currency,
+            include_statement=include_statement, statement_month_label=statement_month_label,
+            statement_user_name=statement_user_name, images={},
+        )
+        images = export_receipt.budget_print_images(
+            sorted_tx, effective_page_size, max_bytes - len(layout), images=images, print_dpi=print_dpi,
+            color_mode=color_mode, deadline=deadline, report=report,
+        )
+        print_dpi = None
     dest = output_buffer if output_buffer is not None else str(output_path)
     c = canvas.Canvas(dest, pagesize=effective_page_size)
 
@@ -270,7 +320,7 @@ def generate_receipts_pdf(
         )
         if not include_receipts:
             c.save()
-            return output_buffer.getvalue() if output_buffer is not None else None
+            return pdf_buffer_value(output_buffer)
         c.showPage()
 
     if include_receipts:
@@ -280,28 +330,22 @@ def generate_receipts_pdf(
             effective_page_size,
             receipts_per_page,
             heading_suffix=statement_month_label,
+            images=images,
+            print_dpi=print_dpi,
+            color_mode=color_mode,
+            deadline=deadline,
+            report=report,
         )
 
     c.save()
-    return output_buffer.getvalue() if output_buffer is not None else None
+    return pdf_buffer_value(output_buffer)
 
 
 def transactions_for_month_user(
-    transactions: list[dict],
+    transactions: list[dict] | TransactionFrame,
     month: date,
     user: str | None,
 ) -> list[dict]:
-    """Filter transactions by month and optional user; return sorted by date then id."""
-    out = []
-    for t in transactions:
-        d = t.get("date")
-        if not d:
-            continue
-        if isinstance(d, str):
-            d = date.fromisoformat(d)
-        if d.year != month.year or d.month != month.month:
-            continue
-        if user and t.get("user") != user:
-            continue
-        out.append(t)
-    return sorted(out, key=lambda x: (x.get("date"), x.get("id")))
+    """Filter transactions (rows or a prebuilt TransactionFrame) by month and optional user; return sorted by date then id."""
+    frame = transactions if isinstance(transactions, TransactionFrame) else TransactionFrame(transactions)
+    return frame.in_month(month.year, month.month).for_user(user).chronological().records()
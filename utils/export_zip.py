@@ -0,0 +1,167 @@
+"""
+Receipt bundle export: the original receipt files for a selection, as a ZIP archive.
+
+Receipt objects are fetched concurrently (utils.receipt_fetch.iter_images) and each one is
+written to the archive as soon as it arrives, under its stored file name
+({user}-{MMDDYY}-{seq}.ext, from receipt_filename_from_url). A manifest.csv with one row per
+transaction (date, user, category, amount, description, file, status) is written last.
+
+The archive is produced incrementally: iter_receipts_zip() yields it in chunks while it is
+being built, so only the images in flight and one chunk are held in memory. Images are
+stored as is (they are already compressed); the manifest is deflated.
+
+Public API:
+- iter_receipts_zip(): yield a ZIP of receipt files + manifest in chunks.
+- write_receipts_zip(): write the same ZIP to a path or binary file; returns the FetchReport.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import zipfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from utils.receipt_fetch import DEFAULT_DEADLINE, FetchReport, iter_images
+from utils.transaction_utils import receipt_filename_from_url, sort_transactions_chronological
+
+MANIFEST_NAME = "manifest.csv"
+MANIFEST_COLUMNS = ["date", "user", "category", "amount", "description", "file", "status", "receipt_url"]
+STATUS_OK = "ok"
+STATUS_NO_RECEIPT = "no_receipt"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write-only stream that collects what ZipFile writes until drained."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _entry_names(urls: list[str]) -> dict[str, str]:
+    """Return {url: archive name}: the stored file name, made unique with -2, -3, ... suffixes."""
+    names: dict[str, str] = {}
+    used: set[str] = set()
+    for i, url in enumerate(urls, start=1):
+        name = receipt_filename_from_url(url) or f"receipt-{i:04d}.jpg"
+        stem, dot, ext = name.rpartition(".")
+        if not dot:
+            stem, ext = name, ""
+        candidate, n = name, 1
+        while candidate in used:
+            n += 1
+            candidate = f"{stem}-{n}{dot}{ext}"
+        used.add(candidate)
+        names[url] = candidate
+    return names
+
+
+def _entry_time(t: dict | None) -> tuple[int, int, int, int, int, int]:
+    """ZIP timestamp for a receipt: its transaction date (ZIP cannot store dates before 1980)."""
+    try:
+        d = date.fromisoformat(str((t or {}).get("date") or "")[:10])
+        if d.year >= 1980:
+            return (d.year, d.month, d.day, 0, 0, 0)
+    except ValueError:
+        pass
+    return datetime.now().timetuple()[:6]
+
+
+def _manifest_csv(
+    transactions: list[dict], names: dict[str, str], report: FetchReport, written: set[str]
+) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(MANIFEST_COLUMNS)
+    for t in transactions:
+        url = (t.get("receipt_url") or "").strip()
+        if not url:
+            status = STATUS_NO_RECEIPT
+        elif url in written:
+            status = STATUS_OK
+        else:
+            status = report.failures.get(url, "error")
+        writer.writerow([
+            t.get("date") or "",
+            t.get("user") or "",
+            t.get("category") or "",
+            t.get("amount") if t.get("amount") is not None else "",
+            t.get("description") or "",
+            names.get(url, "") if url in written else "",
+            status,
+            url,
+        ])
+    return buf.getvalue().encode("utf-8-sig")  # BOM so spreadsheet apps detect UTF-8
+
+
+def iter_receipts_zip(
+    transactions: list[dict],
+    *,
+    deadline: float | None = DEFAULT_DEADLINE,
+    report: FetchReport | None = None,
+) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of the receipt files of transactions, plus MANIFEST_NAME, in chunks.
+
+    Receipts are fetched concurrently within deadline seconds and written in the order they
+    arrive. Receipts that cannot be fetched are left out of the archive; their manifest row has
+    the reason as status, and report (when given) records them.
+    """
+    report = report if report is not None else FetchReport()
+    rows = sort_transactions_chronological(transactions)
+    first_row = {}
+    for t in rows:
+        url = (t.get("receipt_url") or "").strip()
+        if url:
+            first_row.setdefault(url, t)
+    names = _entry_names(list(first_row))
+    written: set[str] = set()
+
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w") as zf:
+        for url, data in iter_images(list(first_row), deadline=deadline, report=report):
+            info = zipfile.ZipInfo(names[url], date_time=_entry_time(first_row[url]))
+            info.compress_type = zipfile.ZIP_STORED
+            zf.writestr(info, data)
+            written.add(url)
+            yield sink.drain()
+        manifest = zipfile.ZipInfo(MANIFEST_NAME, date_time=datetime.now().timetuple()[:6])
+        manifest.compress_type = zipfile.ZIP_DEFLATED
+        zf.writestr(manifest, _manifest_csv(rows, names, report, written))
+    yield sink.drain()
+
+
+def write_receipts_zip(
+    transactions: list[dict],
+    output: str | Path | BinaryIO,
+    *,
+    deadline: float | None = DEFAULT_DEADLINE,
+) -> FetchReport:
+    """
+    Write the receipt ZIP (see iter_receipts_zip) to a path or writable binary file.
+
+    Returns the FetchReport of receipts that could not be included.
+    """
+    report = FetchReport()
+    if isinstance(output, (str, Path)):
+        with open(output, "wb") as f:
+            for chunk in iter_receipts_zip(transactions, deadline=deadline, report=report):
+                f.write(chunk)
+    else:
+        for chunk in iter_receipts_zip(transactions, deadline=deadline, report=report):
+            output.write(chunk)
+    return report
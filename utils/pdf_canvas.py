@@ -0,0 +1,75 @@
+"""
+Thin state-tracking layer over a ReportLab canvas for the PDF exporters.
+
+ReportLab emits a font operator for every setFont call and a separate path for every line.
+CanvasState remembers the current font and colors so redundant changes are skipped, and
+reuses drawings registered as form XObjects (drawn once per document, referenced per page).
+
+Public API:
+- CanvasState: set_font() / set_fill_rgb() / set_stroke_rgb() that skip no-op changes,
+  draw_lines() as one path, draw_form() for reusable XObjects, show_page() that resets state.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Iterable
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+
+class CanvasState:
+    """Canvas wrapper that tracks font / color state per page and caches form XObjects."""
+
+    __slots__ = ("c", "_font", "_fill", "_stroke", "_forms")
+
+    def __init__(self, c: "Canvas") -> None:
+        self.c = c
+        self._forms: set[str] = set()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget tracked state (ReportLab resets graphics state on every new page)."""
+        self._font: tuple[str, float] | None = None
+        self._fill: tuple[float, float, float] | None = None
+        self._stroke: tuple[float, float, float] | None = None
+
+    def set_font(self, name: str, size: float) -> None:
+        if self._font != (name, size):
+            self.c.setFont(name, size)
+            self._font = (name, size)
+
+    def set_fill_rgb(self, r: float, g: float, b: float) -> None:
+        if self._fill != (r, g, b):
+            self.c.setFillColorRGB(r, g, b)
+            self._fill = (r, g, b)
+
+    def set_stroke_rgb(self, r: float, g: float, b: float) -> None:
+        if self._stroke != (r, g, b):
+            self.c.setStrokeColorRGB(r, g, b)
+            self._stroke = (r, g, b)
+
+    def draw_lines(self, lines: Iterable[tuple[float, float, float, float]]) -> None:
+        """Stroke (x1, y1, x2, y2) segments as a single path."""
+        p = self.c.beginPath()
+        for x1, y1, x2, y2 in lines:
+            p.moveTo(x1, y1)
+            p.lineTo(x2, y2)
+        self.c.drawPath(p, stroke=1, fill=0)
+
+    def draw_form(self, name: str, draw: Callable[["Canvas"], None]) -> None:
+        """
+        Place form XObject name on the current page, defining it with draw(canvas) on first use.
+        Forms are drawn in their own graphics state, so tracked state is unaffected.
+        """
+        if name not in self._forms:
+            self.c.beginForm(name)
+            draw(self.c)
+            self.c.endForm()
+            self._forms.add(name)
+        self.c.doForm(name)
+
+    def show_page(self) -> None:
+        """End the current page and reset tracked state."""
+        self.c.showPage()
+        self.reset()
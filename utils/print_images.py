@@ -0,0 +1,381 @@
+"""
+Print-resolution receipt image derivatives for PDF export.
+
+Receipt cells are small (about 107×230 pt on A4), so embedding full phone photos wastes
+space and render time. prepare_print_image() crops each image to the cell's cover box and
+resamples it to a target DPI before it reaches ReportLab.
+
+Baseline RGB/grayscale JPEGs (what utils.receipt_scanner.process_receipt stores) are recognised
+from their header alone; when no resampling is needed their DCT bytes are embedded as is.
+
+Receipts are mostly dark text on light paper, so two smaller modes are offered besides color:
+COLOR_MODE_GRAY (contrast-stretched, 16 gray levels) and COLOR_MODE_BILEVEL (adaptive threshold
+against the local mean, so shadows and uneven lighting do not turn into black areas). Both are
+stored as PNG and embedded losslessly (Flate); text edges stay sharp and pages shrink 3-20×.
+
+Public API:
+- prepare_print_image(): crop + resample one image to a box at a target DPI (JPEG bytes).
+- prepare_print_images(): same for a {url: bytes} mapping.
+- fit_print_image() / fit_print_images(): same, choosing resolution and quality per image so
+  the JPEGs fit a byte budget.
+- embedded_size(): bytes a prepared image takes inside the PDF.
+- read_jpeg_header(): parse size / components / progressive flag from JPEG markers (no decode).
+- is_passthrough_jpeg(): True if the bytes can be embedded in a PDF without re-encoding.
+"""
+
+from __future__ import annotations
+
+import math
+import zlib
+from io import BytesIO
+from typing import Mapping
+
+try:
+    from PIL import Image, ImageChops, ImageFilter, ImageOps
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+try:
+    from reportlab import rl_config
+except ImportError:
+    rl_config = None
+
+DEFAULT_PRINT_DPI = 200
+DEFAULT_PRINT_QUALITY = 85
+
+# Receipt image modes: full-color JPEG, 16-level grayscale or black & white (both lossless PNG)
+COLOR_MODE_COLOR = "color"
+COLOR_MODE_GRAY = "gray"
+COLOR_MODE_BILEVEL = "bilevel"
+COLOR_MODES = (COLOR_MODE_COLOR, COLOR_MODE_GRAY, COLOR_MODE_BILEVEL)
+_GRAY_LEVELS = 16
+_BILEVEL_OFFSET = 10  # a pixel is ink if this much darker than its neighbourhood mean
+_BILEVEL_DARK = 80  # ... or darker than this (solid areas wider than the window, e.g. logos)
+# Floor for size-budgeted exports (fit_print_image): receipt text stays readable at this
+# resolution and quality in an A4 image cell.
+BUDGET_MIN_DPI = 110
+BUDGET_MIN_QUALITY = 35
+
+# Start-of-frame markers: baseline, extended sequential, progressive (Huffman coded)
+_SOF_BASELINE = (0xC0, 0xC1)
+_SOF_PROGRESSIVE = 0xC2
+_SOF_OTHER = (0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)
+# Markers without a length field
+_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+
+
+def read_jpeg_header(data: bytes) -> dict | None:
+    """
+    Parse JPEG markers up to the first start-of-frame; no pixel data is decoded.
+
+    Returns dict with width, height, components, precision, baseline, progressive, adobe_transform
+    (None when there is no Adobe APP14 segment), or None if data is not a readable JPEG.
+    """
+    if not data or data[:2] != b"\xff\xd8":
+        return None
+    adobe_transform = None
+    i, n = 2, len(data)
+    while i + 4 <= n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            i += 2
+            continue
+        if marker in (0xD9, 0xDA):  # EOI / SOS before any frame header
+            return None
+        length = int.from_bytes(data[i + 2 : i + 4], "big")
+        segment = data[i + 4 : i + 2 + length]
+        if marker == 0xEE and segment[:5] == b"Adobe" and len(segment) >= 12:
+            adobe_transform = segment[11]
+        elif marker in _SOF_BASELINE or marker == _SOF_PROGRESSIVE or marker in _SOF_OTHER:
+            if len(segment) < 6:
+                return None
+            return {
+                "width": int.from_bytes(segment[3:5], "big"),
+                "height": int.from_bytes(segment[1:3], "big"),
+                "components": segment[5],
+                "precision": segment[0],
+                "progressive": marker == _SOF_PROGRESSIVE,
+                "baseline": marker in _SOF_BASELINE,
+                "adobe_transform": adobe_transform,
+            }
+        i += 2 + length
+    return None
+
+
+def is_passthrough_jpeg(data: bytes) -> bool:
+    """
+    True if data is an 8-bit baseline JPEG in RGB (YCbCr) or grayscale.
+
+    Those can be embedded in a PDF as DCT data without decoding. CMYK, progressive,
+    lossless/arithmetic-coded and Adobe RGB-without-transform JPEGs need conversion.
+    """
+    info = read_jpeg_header(data)
+    if info is None or not info["baseline"] or info["precision"] != 8:
+        return False
+    if info["components"] == 1:
+        return True
+    return info["components"] == 3 and info["adobe_transform"] != 0
+
+
+def _cover_crop_box(
+    width: int,
+    height: int,
+    box_w: float,
+    box_h: float,
+) -> tuple[int, int, int, int]:
+    """Return PIL crop box (left, upper, right, lower) for the centered region with the box's aspect."""
+    box_ratio = box_w / box_h
+    if width / height > box_ratio:
+        cw, ch = max(1, round(height * box_ratio)), height
+    else:
+        cw, ch = width, max(1, round(width / box_ratio))
+    x = (width - cw) // 2
+    y = (height - ch) // 2
+    return (x, y, x + cw, y + ch)
+
+
+def _target_size(box_w_pt: float, box_h_pt: float, dpi: float) -> tuple[int, int]:
+    return max(1, math.ceil(box_w_pt / 72 * dpi)), max(1, math.ceil(box_h_pt / 72 * dpi))
+
+
+def _cover_image(data: bytes, target_w: int, target_h: int) -> "Image.Image":
+    """Decode data, crop to the cover box of target_w × target_h and downsample to it (never upscale)."""
+    img = Image.open(BytesIO(data))
+
+    # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while keeping the cover box >= target.
+    scale = max(target_w / img.width, target_h / img.height)
+    if scale < 1:
+        img.draft(img.mode if img.mode in ("RGB", "L") else "RGB",
+                  (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img = img.crop(_cover_crop_box(img.width, img.height, target_w, target_h))
+    if img.width > target_w or img.height > target_h:
+        img = img.resize((target_w, target_h), Image.Resampling.LANCZOS)
+    return img
+
+
+def _encode_jpeg(img: "Image.Image", quality: int) -> bytes:
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def _to_gray(img: "Image.Image") -> "Image.Image":
+    """Grayscale with paper stretched to white and ink to black, quantized to _GRAY_LEVELS."""
+    img = ImageOps.autocontrast(img.convert("L"), cutoff=1)
+    step = 256 // _GRAY_LEVELS
+    return img.point(lambda v: (v // step) * 255 // (_GRAY_LEVELS - 1))
+
+
+def _to_bilevel(img: "Image.Image", dpi: float) -> "Image.Image":
+    """Black & white by adaptive threshold: ink where a pixel is darker than its local mean."""
+    gray = img.convert("L")
+    local_mean = gray.filter(ImageFilter.BoxBlur(max(4, round(dpi / 14))))  # ~2 mm window
+    ink = ImageChops.subtract(local_mean, gray)  # positive where darker than the neighbourhood
+    edges = ink.point(lambda v: 0 if v > _BILEVEL_OFFSET else 255, mode="1")
+    solid = gray.point(lambda v: 0 if v < _BILEVEL_DARK else 255, mode="1")
+    return ImageChops.logical_and(edges, solid)  # white only where neither marks ink
+
+
+def _encode_lossless(img: "Image.Image", color_mode: str, dpi: float) -> bytes:
+    img = _to_bilevel(img, dpi) if color_mode == COLOR_MODE_BILEVEL else _to_gray(img)
+    buf = BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def _stream_size(n: int) -> int:
+    """Bytes an n-byte image stream takes in the PDF: ReportLab ASCII85-encodes it (5 bytes per 4) by default."""
+    if rl_config is not None and getattr(rl_config, "useA85", 0):
+        return -(-n // 4) * 5
+    return n
+
+
+def embedded_size(data: bytes) -> int:
+    """
+    Bytes data takes as a PDF image: JPEGs are embedded as is; gray / bilevel PNGs as 8-bit
+    gray Flate, as ReportLab writes them. Includes ReportLab's ASCII85 encoding when enabled.
+    """
+    if not data or data[:2] == b"\xff\xd8" or not HAS_PIL:
+        return _stream_size(len(data or b""))
+    try:
+        return _stream_size(len(zlib.compress(Image.open(BytesIO(data)).convert("L").tobytes())))
+    except Exception:
+        return _stream_size(len(data))
+
+
+def prepare_print_image(
+    data: bytes,
+    box_w_pt: float,
+    box_h_pt: float,
+    *,
+    dpi: int = DEFAULT_PRINT_DPI,
+    quality: int = DEFAULT_PRINT_QUALITY,
+    color_mode: str = COLOR_MODE_COLOR,
+) -> bytes | None:
+    """
+    Crop image to the cover box of (box_w_pt × box_h_pt) and resample to dpi; return image bytes.
+
+    COLOR_MODE_COLOR returns a JPEG at quality; COLOR_MODE_GRAY / COLOR_MODE_BILEVEL return a
+    lossless PNG (quality is ignored). Images smaller than the target are cropped but not
+    upscaled. In color mode, a passthrough JPEG (is_passthrough_jpeg) that already fits the
+    target is returned unchanged, without decoding.
+    Returns None if the image cannot be decoded (or PIL is missing).
+    """
+    if not HAS_PIL or not data or box_w_pt <= 0 or box_h_pt <= 0:
+        return None
+    try:
+        target_w, target_h = _target_size(box_w_pt, box_h_pt, dpi)
+        if color_mode != COLOR_MODE_COLOR:
+            return _encode_lossless(_cover_image(data, target_w, target_h), color_mode, dpi)
+        if is_passthrough_jpeg(data):
+            info = read_jpeg_header(data)
+            if info["width"] <= target_w and info["height"] <= target_h:
+                return data
+        return _encode_jpeg(_cover_image(data, target_w, target_h), quality)
+    except Exception:
+        return None
+
+
+def prepare_print_images(
+    images: Mapping[str, bytes],
+    box_w_pt: float,
+    box_h_pt: float,
+    *,
+    dpi: int = DEFAULT_PRINT_DPI,
+    quality: int = DEFAULT_PRINT_QUALITY,
+    color_mode: str = COLOR_MODE_COLOR,
+) -> dict[str, bytes]:
+    """Return {url: prepared image bytes} for every image that could be prepared."""
+    out = {}
+    for url, data in images.items():
+        prepared = prepare_print_image(data, box_w_pt, box_h_pt, dpi=dpi, quality=quality, color_mode=color_mode)
+        if prepared:
+            out[url] = prepared
+    return out
+
+
+def _budget_dpis(dpi: int, min_dpi: int) -> list[int]:
+    """Resolutions tried by fit_print_image, from dpi down to min_dpi in ~15% steps."""
+    dpis = [dpi]
+    while dpis[-1] > min_dpi:
+        dpis.append(max(min_dpi, int(dpis[-1] * 0.85)))
+    return dpis
+
+
+def _fit_lossless(
+    data: bytes,
+    box_w_pt: float,
+    box_h_pt: float,
+    max_bytes: int,
+    dpi: int,
+    min_dpi: int,
+    color_mode: str,
+) -> bytes:
+    base = None
+    for step_dpi in _budget_dpis(dpi, min_dpi):
+        target_w, target_h = _target_size(box_w_pt, box_h_pt, step_dpi)
+        if base is None:
+            base = img = _cover_image(data, target_w, target_h)
+        else:
+            img = base.resize((min(base.width, target_w), min(base.height, target_h)), Image.Resampling.LANCZOS)
+        out = _encode_lossless(img, color_mode, step_dpi)
+        if embedded_size(out) <= max_bytes:
+            return out
+    return out
+
+
+def fit_print_image(
+    data: bytes,
+    box_w_pt: float,
+    box_h_pt: float,
+    max_bytes: int,
+    *,
+    dpi: int = DEFAULT_PRINT_DPI,
+    quality: int = DEFAULT_PRINT_QUALITY,
+    min_dpi: int = BUDGET_MIN_DPI,
+    min_quality: int = BUDGET_MIN_QUALITY,
+    color_mode: str = COLOR_MODE_COLOR,
+) -> bytes | None:
+    """
+    Like prepare_print_image(), but return the sharpest image of at most max_bytes embedded.
+
+    The image is decoded once. Quality is lowered first (binary search between quality and
+    min_quality), then resolution in ~15% steps down to min_dpi; gray and bilevel images have
+    no quality setting, so only resolution is lowered. If even the floor is over max_bytes,
+    that encoding is returned anyway: legibility wins over the budget.
+    Returns None if the image cannot be decoded (or PIL is missing).
+    """
+    if not HAS_PIL or not data or box_w_pt <= 0 or box_h_pt <= 0:
+        return None
+    try:
+        if color_mode != COLOR_MODE_COLOR:
+            return _fit_lossless(data, box_w_pt, box_h_pt, max_bytes, dpi, min(dpi, min_dpi), color_mode)
+        if len(data) <= max_bytes and is_passthrough_jpeg(data):
+            info = read_jpeg_header(data)
+            target_w, target_h = _target_size(box_w_pt, box_h_pt, dpi)
+            if info["width"] <= target_w and info["height"] <= target_h:
+                return data
+        base = None
+        smallest = None
+        for step_dpi in _budget_dpis(dpi, min(dpi, min_dpi)):
+            target_w, target_h = _target_size(box_w_pt, box_h_pt, step_dpi)
+            if base is None:
+                base = img = _cover_image(data, target_w, target_h)
+            elif base.width > target_w or base.height > target_h:
+                img = base.resize((min(base.width, target_w), min(base.height, target_h)), Image.Resampling.LANCZOS)
+            else:
+                img = base
+            out = _encode_jpeg(img, quality)
+            if embedded_size(out) <= max_bytes:
+                return out
+            smallest = _encode_jpeg(img, min_quality)
+            if embedded_size(smallest) > max_bytes:
+                continue  # no quality fits at this resolution
+            lo, hi, best = min_quality, quality - 1, smallest
+            while lo <= hi:
+                mid = (lo + hi) // 2
+                out = _encode_jpeg(img, mid)
+                if embedded_size(out) <= max_bytes:
+                    best, lo = out, mid + 1
+                else:
+                    hi = mid - 1
+            return best
+        return smallest
+    except Exception:
+        return None
+
+
+def fit_print_images(
+    images: Mapping[str, bytes],
+    box_w_pt: float,
+    box_h_pt: float,
+    max_bytes: int,
+    *,
+    dpi: int = DEFAULT_PRINT_DPI,
+    quality: int = DEFAULT_PRINT_QUALITY,
+    color_mode: str = COLOR_MODE_COLOR,
+) -> dict[str, bytes]:
+    """
+    Return {url: image bytes} whose embedded sizes add up to at most max_bytes (see fit_print_image).
+
+    The budget is split evenly over the images in mapping order; bytes an image does not use
+    (or a failed decode) are shared among the images after it.
+    """
+    out = {}
+    remaining = max_bytes
+    for i, (url, data) in enumerate(images.items()):
+        share = max(0, remaining) // (len(images) - i)
+        fitted = fit_print_image(data, box_w_pt, box_h_pt, share, dpi=dpi, quality=quality, color_mode=color_mode)
+        if fitted:
+            out[url] = fitted
+            remaining -= embedded_size(fitted)
+    return out
@@ -0,0 +1,271 @@
+"""
+On-disk cache for receipt images fetched during PDF export.
+
+Receipt objects are effectively immutable once uploaded ({user}-{MMDDYY}-{seq}.ext), so
+re-exporting a month should not download them again. Entries are keyed by receipt URL and
+served without network access while fresh; stale entries are revalidated with
+If-None-Match / If-Modified-Since (a 304 keeps the cached bytes). The cache is capped in
+size and evicts least recently used entries first.
+
+Settings (environment, read by get_default_cache()):
+- RECEIPT_CACHE_DIR: cache directory (default ~/.cache/organize-receipt/receipts).
+- RECEIPT_CACHE_MAX_MB: size cap in MB (default 500; 0 disables the cache).
+- RECEIPT_CACHE_FRESH_SECONDS: serve entries without revalidation for this long (default 86400).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "organize-receipt" / "receipts"
+DEFAULT_MAX_MB = 500
+DEFAULT_FRESH_SECONDS = 24 * 60 * 60
+
+_default_cache: "ReceiptImageCache | None" = None
+_default_cache_lock = threading.Lock()
+
+
+class ReceiptImageCache:
+    """Size-capped LRU cache of receipt image bytes on local disk, keyed by URL."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+        fresh_seconds: float = DEFAULT_FRESH_SECONDS,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size: int | None = None  # total bytes on disk, scanned lazily
+
+    # -------------------------------------------------------------------------
+    # Paths and metadata
+    # -------------------------------------------------------------------------
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _data_path(self, key: str) -> Path:
+        return self.root / f"{key}.bin"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def _read_meta(self, key: str) -> dict | None:
+        try:
+            with open(self._meta_path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+    def fetch(self, url: str, timeout: float = 10) -> bytes | None:
+        """
+        Return image bytes for url, using the cache when possible.
+
+        Fresh entries are returned without network access. Stale entries are revalidated
+        (304 keeps them). If the network fails, a stale entry is still returned. An HTTP error
+        with nothing cached to fall back on is raised (urllib.error.HTTPError), so callers can
+        tell a missing receipt (404) from an outage.
+        """
+        if not url:
+            return None
+        key = self._key(url)
+        meta = self._read_meta(key)
+        cached = None
+        if meta is not None:
+            try:
+                cached = self._data_path(key).read_bytes()
+            except OSError:
+                meta = None
+
+        if meta is not None and time.time() - meta.get("checked_at", 0) < self.fresh_seconds:
+            self._count("hits")
+            self._touch(key)
+            return cached
+
+        request = urllib.request.Request(url)
+        if meta is not None:
+            if meta.get("etag"):
+                request.add_header("If-None-Match", meta["etag"])
+            if meta.get("last_modified"):
+                request.add_header("If-Modified-Since", meta["last_modified"])
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as r:
+                data = r.read()
+                etag = r.headers.get("ETag")
+                last_modified = r.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached is not None:
+                meta["checked_at"] = time.time()
+                self._write_atomic(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+                self._count("hits")
+                self._count("revalidations")
+                self._touch(key)
+                return cached
+            if cached is None:
+                raise
+            return cached
+        except Exception:
+            return cached
+
+        self._count("misses")
+        if data:
+            self._store(key, url, data, etag, last_modified)
+        return data
+
+    def stats(self) -> dict:
+        """Return counters and current size: hits, misses, revalidations, evictions, bytes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "bytes": self._current_size(),
+            }
+
+    def clear(self) -> None:
+        """Delete every cached entry."""
+        with self._lock:
+            for path in self._entries():
+                self._unlink_entry(path)
+            self._size = 0
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _touch(self, key: str) -> None:
+        """Mark entry as recently used (mtime drives LRU order)."""
+        try:
+            os.utime(self._data_path(key))
+        except OSError:
+            pass
+
+    def _entries(self) -> list[Path]:
+        try:
+            return list(self.root.glob("*.bin"))
+        except OSError:
+            return []
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            total = 0
+            for path in self._entries():
+                try:
+                    total += path.stat().st_size
+                except OSError:
+                    pass
+            self._size = total
+        return self._size
+
+    def _unlink_entry(self, data_path: Path) -> int:
+        """Remove one entry (data + metadata); return bytes freed."""
+        try:
+            size = data_path.stat().st_size
+            data_path.unlink()
+        except OSError:
+            return 0
+        try:
+            data_path.with_suffix(".json").unlink()
+        except OSError:
+            pass
+        return size
+
+    def _store(self, key: str, url: str, data: bytes, etag: str | None, last_modified: str | None) -> None:
+        if len(data) > self.max_bytes:
+            return
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "checked_at": time.time(),
+            "size": len(data),
+        }
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            data_path = self._data_path(key)
+            with self._lock:
+                # Size before the write, so a lazy scan does not count the new file twice.
+                size = self._current_size()
+                previous = data_path.stat().st_size if data_path.exists() else 0
+                self._write_atomic(data_path, data)
+                self._write_atomic(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+                self._size = size - previous + len(data)
+                self._evict_locked(keep=data_path)
+        except OSError:
+            pass
+
+    def _evict_locked(self, keep: Path) -> None:
+        """Drop least recently used entries until the cache fits max_bytes (lock held)."""
+        if self._current_size() <= self.max_bytes:
+            return
+        by_age = []
+        for path in self._entries():
+            try:
+                by_age.append((path.stat().st_mtime, path))
+            except OSError:
+                pass
+        by_age.sort()
+        for _, path in by_age:
+            if self._size <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            freed = self._unlink_entry(path)
+            if freed:
+                self._size -= freed
+                self.evictions += 1
+
+
+def get_default_cache() -> ReceiptImageCache | None:
+    """Return the process-wide cache configured from the environment, or None if disabled."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                max_mb = float(os.environ.get("RECEIPT_CACHE_MAX_MB", DEFAULT_MAX_MB))
+                fresh = float(os.environ.get("RECEIPT_CACHE_FRESH_SECONDS", DEFAULT_FRESH_SECONDS))
+            except ValueError:
+                max_mb, fresh = DEFAULT_MAX_MB, DEFAULT_FRESH_SECONDS
+            if max_mb <= 0:
+                return None
+            root = os.environ.get("RECEIPT_CACHE_DIR", "").strip() or DEFAULT_CACHE_DIR
+            _default_cache = ReceiptImageCache(
+                Path(root).expanduser(),
+                max_bytes=int(max_mb * 1024 * 1024),
+                fresh_seconds=fresh,
+            )
+        return _default_cache
@@ -0,0 +1,299 @@
+"""
+Receipt image fetching for PDF exports.
+
+Receipt URLs for an export are resolved up front with a bounded thread pool, so drawing
+pages never waits on storage one receipt at a time. Fetches go through the on-disk
+receipt cache (utils.receipt_cache) unless it is disabled.
+
+The whole prefetch runs against one deadline. Failed requests are retried with jittered
+exponential backoff while time remains, and a CircuitBreaker stops hammering storage once
+several requests in a row fail: the remaining URLs fail fast and the export goes ahead with
+placeholders. A 4xx response (e.g. 404 for a deleted receipt) is final: it is not retried and
+does not count against the breaker, since storage answered. Why each image is missing is recorded in a FetchReport.
+
+Public API:
+- fetch_image_bytes(): download one receipt image (None on failure).
+- prefetch_images(): download many receipt images concurrently; returns {url: bytes}.
+- iter_images(): same, yielding (url, bytes) as each download completes (bounded memory).
+- CircuitBreaker: consecutive-failure breaker shared by the fetches of one export.
+- FetchReport: URLs that could not be fetched (or used) and why; retry / breaker counters.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator
+
+from utils.receipt_cache import ReceiptImageCache, get_default_cache
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 10  # seconds per request
+DEFAULT_DEADLINE = 60  # seconds for the whole prefetch
+DEFAULT_RETRIES = 2  # extra attempts per URL after a failure
+DEFAULT_BACKOFF = 0.5  # seconds before the first retry; doubles per attempt
+_RETRYABLE_4XX = (408, 429)  # request timeout / rate limited: worth another attempt
+
+# FetchReport reasons
+FAIL_DEADLINE = "deadline"  # not fetched before the export deadline
+FAIL_ERROR = "error"  # every attempt failed (network error, HTTP error, empty body), or a 4xx
+FAIL_CIRCUIT_OPEN = "circuit_open"  # skipped while storage looked down
+FAIL_UNREADABLE = "unreadable"  # fetched, but not a decodable image
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures; while open, allow() is False.
+
+    After reset_after seconds one request is let through (half-open): success closes the
+    breaker, failure opens it again. Thread-safe; share one instance across an export.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 15.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.trips = 0
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """True if a request may be made now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_after:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    self.trips += 1
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class FetchReport:
+    """Why receipt images are missing from an export ({url: reason}), plus retry counters."""
+
+    def __init__(self) -> None:
+        self.failures: dict[str, str] = {}
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def fail(self, url: str, reason: str) -> None:
+        """Record url as missing; the first reason recorded for a URL is kept."""
+        with self._lock:
+            self.failures.setdefault(url, reason)
+
+    def _retried(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def __len__(self) -> int:
+        return len(self.failures)
+
+
+def _fetch_once(url: str, timeout: float, cache: ReceiptImageCache | None) -> bytes | None:
+    """As fetch_image_bytes(), but a permanent HTTP error (4xx, not 408 / 429) is raised."""
+    try:
+        if cache is not None:
+            return cache.fetch(url, timeout=timeout)
+        with urllib.request.urlopen(url, timeout=timeout) as r:
+            return r.read()
+    except urllib.error.HTTPError as e:
+        if 400 <= e.code < 500 and e.code not in _RETRYABLE_4XX:
+            raise
+        return None
+    except Exception:
+        return None
+
+
+def fetch_image_bytes(
+    url: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: ReceiptImageCache | None = None,
+) -> bytes | None:
+    """Fetch image bytes from URL (through cache when given), or None on failure."""
+    if not url:
+        return None
+    try:
+        return _fetch_once(url, timeout, cache)
+    except urllib.error.HTTPError:
+        return None
+
+
+def _fetch_with_retry(
+    url: str,
+    timeout: float,
+    cache: ReceiptImageCache | None,
+    end: float | None,
+    retries: int,
+    backoff: float,
+    breaker: CircuitBreaker,
+    report: FetchReport,
+) -> bytes | None:
+    """
+    Fetch url with up to retries extra attempts, never past end (time.monotonic()).
+    A 4xx answer is recorded once as FAIL_ERROR, without retrying or tripping the breaker.
+    """
+    for attempt in range(retries + 1):
+        remaining = timeout if end is None else end - time.monotonic()
+        if remaining <= 0:
+            report.fail(url, FAIL_DEADLINE)
+            return None
+        if not breaker.allow():
+            report.fail(url, FAIL_CIRCUIT_OPEN)
+            return None
+        try:
+            data = _fetch_once(url, min(timeout, remaining), cache) if url else None
+        except urllib.error.HTTPError:
+            # Gone or forbidden: retrying will not help, and storage is evidently up.
+            breaker.record_success()
+            report.fail(url, FAIL_ERROR)
+            return None
+        if data:
+            breaker.record_success()
+            return data
+        breaker.record_failure()
+        if attempt == retries:
+            break
+        delay = backoff * 2**attempt * random.uniform(0.5, 1.5)
+        if end is not None and time.monotonic() + delay >= end:
+            report.fail(url, FAIL_DEADLINE)
+            return None
+        report._retried()
+        time.sleep(delay)
+    report.fail(url, FAIL_ERROR)
+    return None
+
+
+def unique_urls(urls: Iterable[str]) -> list[str]:
+    """Return stripped, non-empty URLs in first-seen order without duplicates."""
+    return list(dict.fromkeys(u.strip() for u in urls if u and u.strip()))
+
+
+def iter_images(
+    urls: Iterable[str],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+    deadline: float | None = DEFAULT_DEADLINE,
+    cache: ReceiptImageCache | None = None,
+    use_cache: bool = True,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    breaker: CircuitBreaker | None = None,
+    report: FetchReport | None = None,
+) -> Iterator[tuple[str, bytes]]:
+    """
+    Fetch URLs concurrently and yield (url, bytes) in completion order.
+
+    At most 2 × max_workers fetches are in flight or waiting to be consumed, so a slow
+    consumer (e.g. a ZIP writer) holds a bounded number of images in memory. Arguments are
+    as for prefetch_images(); URLs not yielded are recorded in report.
+    """
+    pending = unique_urls(urls)
+    if not pending:
+        return
+    if not use_cache:
+        cache = None
+    elif cache is None:
+        cache = get_default_cache()
+    breaker = breaker or CircuitBreaker()
+    report = report if report is not None else FetchReport()
+    end = None if deadline is None else time.monotonic() + deadline
+    queue = iter(pending)
+    in_flight: dict = {}
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending))))
+
+    def submit_next() -> None:
+        url = next(queue, None)
+        if url is not None:
+            future = pool.submit(_fetch_with_retry, url, timeout, cache, end, retries, backoff, breaker, report)
+            in_flight[future] = url
+
+    try:
+        for _ in range(2 * max(1, max_workers)):
+            submit_next()
+        while in_flight:
+            remaining = None if end is None else max(0.0, end - time.monotonic())
+            done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:  # deadline passed
+                for url in [*in_flight.values(), *queue]:
+                    report.fail(url, FAIL_DEADLINE)
+                return
+            for future in done:
+                url = in_flight.pop(future)
+                submit_next()
+                data = future.result()
+                if data:
+                    yield url, data
+    finally:
+        # Do not block on stragglers past the deadline; their sockets time out on their own.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def prefetch_images(
+    urls: Iterable[str],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+    deadline: float | None = DEFAULT_DEADLINE,
+    cache: ReceiptImageCache | None = None,
+    use_cache: bool = True,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    breaker: CircuitBreaker | None = None,
+    report: FetchReport | None = None,
+) -> dict[str, bytes]:
+    """
+    Fetch all URLs concurrently and return {url: bytes} for the ones that succeeded.
+
+    Args:
+        urls: Receipt URLs (duplicates and blanks are ignored).
+        max_workers: Upper bound on concurrent requests.
+        timeout: Per-request timeout in seconds.
+        deadline: Overall time budget in seconds, retries included; fetches still running
+            then are dropped. None waits for every request (each still bounded by timeout).
+        cache: Image cache to read through; defaults to get_default_cache().
+        use_cache: If False, always download (cache is ignored).
+        retries: Extra attempts per URL after a failure, with jittered exponential backoff.
+        backoff: Delay in seconds before the first retry.
+        breaker: Circuit breaker to consult and update (share one across batches of an export);
+            a new one is used when None.
+        report: Receives the reason for every URL that is not in the result.
+    """
+    return dict(iter_images(
+        urls,
+        max_workers=max_workers,
+        timeout=timeout,
+        deadline=deadline,
+        cache=cache,
+        use_cache=use_cache,
+        retries=retries,
+        backoff=backoff,
+        breaker=breaker,
+        report=report,
+    ))
@@ -2,10 +2,16 @@
 Receipt print grid: A4, heading + line, then 3 sections.
 Each section = name row (5 cells) + line + image row (5 cells).
 GAP (with lines above/below) between sections.
+
+All geometry is computed once per page size and grid density (ReceiptGridGeometry,
+memoized by get_receipt_grid_geometry()); the get_* helpers below are lookups on it.
 """
 
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import NamedTuple
+
 try:
     from reportlab.lib.pagesizes import A4
     from reportlab.lib.units import inch
@@ -34,59 +40,151 @@ def get_page_size():
     return A4
 
 
-def get_receipt_grid_layout(page_size: tuple[float, float] | None = None) -> dict:
+class ReceiptGridGeometry(NamedTuple):
     """
-    Layout for receipt print: heading, line, then 3 sections with GAPs between.
-    Returns dict with: margin, cols, sections, cell_w, name_row_height, image_row_height,
-    heading_height, line_pt, gap_height, page_w, page_h, content_top_y,
-    and lists for drawing: section_rects, gap_rects, separator_lines.
+    Immutable, precomputed receipt grid for one page size and density (cols × sections).
+
+    Rects are (left, bottom, width, height); lines are (x1, y, x2, y). Cell tuples are indexed
+    by receipt slot: section * cols + col. Built once per (page size, cols, sections) by
+    get_receipt_grid_geometry(), so drawing a page is only tuple lookups.
     """
-    w, h = page_size or get_page_size()
+
+    page_w: float
+    page_h: float
+    margin: float
+    cols: int
+    sections: int
+    cell_w: float
+    name_row_height: float
+    image_row_height: float
+    heading_height: float
+    line_pt: float
+    gap_height: float
+    content_top_y: float
+    section_height: float
+    gap_band_height: float
+    heading_line_y: float
+    name_rects: tuple[tuple[float, float, float, float], ...]
+    image_rects: tuple[tuple[float, float, float, float], ...]
+    separator_lines: tuple[tuple[float, float, float, float], ...]
+    gap_rects: tuple[tuple[float, float, float, float], ...]
+
+    @property
+    def slots(self) -> int:
+        """Receipts per page (cols × sections)."""
+        return self.cols * self.sections
+
+    def cell_rect(self, section: int, col: int, cell_type: str) -> tuple[float, float, float, float]:
+        """Return (left, bottom, width, height) for a 'name' or 'image' cell."""
+        rects = self.name_rects if cell_type == "name" else self.image_rects
+        return rects[section * self.cols + col]
+
+
+@lru_cache(maxsize=32)
+def _build_geometry(w: float, h: float, cols: int, sections: int) -> ReceiptGridGeometry:
     m = MARGIN_PT
     content_top = h - m - HEADING_HEIGHT_PT - LINE_PT  # y of top of first section (below heading line)
     content_height = content_top - m  # from top of section 1 down to bottom margin
 
-    # content_height = 3 * (name_row + line + image_row) + 2 * (gap + 2*line)
-    # image_row_height = (content_height - 3*NAME_ROW_HEIGHT_PT - 3*LINE_PT - 2*GAP_HEIGHT_PT - 4*LINE_PT) / 3
+    # content_height = sections * (name_row + line + image_row) + (sections - 1) * (gap + 2*line)
     image_row_height = (
         content_height
-        - 3 * NAME_ROW_HEIGHT_PT
-        - 7 * LINE_PT
-        - 2 * GAP_HEIGHT_PT
-    ) / 3
-
-    usable_w = w - 2 * m
-    cell_w = usable_w / COLS
+        - sections * NAME_ROW_HEIGHT_PT
+        - (3 * sections - 2) * LINE_PT
+        - (sections - 1) * GAP_HEIGHT_PT
+    ) / sections
 
+    cell_w = (w - 2 * m) / cols
     section_height = NAME_ROW_HEIGHT_PT + LINE_PT + image_row_height
     gap_band_height = GAP_HEIGHT_PT + 2 * LINE_PT
+    heading_line_y = h - m - HEADING_HEIGHT_PT
+
+    name_rects = []
+    image_rects = []
+    for section in range(sections):
+        # Section 0 top = content top; each later section starts after one section + GAP band.
+        section_top = content_top - section * (section_height + gap_band_height)
+        name_bottom = section_top - NAME_ROW_HEIGHT_PT
+        image_bottom = name_bottom - LINE_PT - image_row_height
+        for col in range(cols):
+            left = m + col * cell_w
+            name_rects.append((left, name_bottom, cell_w, NAME_ROW_HEIGHT_PT))
+            image_rects.append((left, image_bottom, cell_w, image_row_height))
+
+    # Below heading; below each name row and each image row; top of each section after a GAP.
+    lines = [(m, heading_line_y, w - m, heading_line_y)]
+    for section in range(sections):
+        section_top = content_top - section * (section_height + gap_band_height)
+        y = section_top - NAME_ROW_HEIGHT_PT
+        lines.append((m, y, w - m, y))
+        y = y - LINE_PT - image_row_height
+        lines.append((m, y, w - m, y))
+    for section in range(1, sections):
+        y = content_top - section * (section_height + gap_band_height)
+        lines.append((m, y, w - m, y))
 
-    return {
-        "margin": m,
-        "cols": COLS,
-        "sections": SECTIONS,
-        "cell_w": cell_w,
-        "name_row_height": NAME_ROW_HEIGHT_PT,
-        "image_row_height": image_row_height,
-        "heading_height": HEADING_HEIGHT_PT,
-        "line_pt": LINE_PT,
-        "gap_height": GAP_HEIGHT_PT,
-        "page_w": w,
-        "page_h": h,
-        "content_top_y": content_top,
-        "section_height": section_height,
-        "gap_band_height": gap_band_height,
-    }
+    gap_rects = tuple(
+        (m, content_top - (s + 1) * (section_height + gap_band_height), w - 2 * m, gap_band_height)
+        for s in range(sections - 1)
+    )
+
+    return ReceiptGridGeometry(
+        page_w=w,
+        page_h=h,
+        margin=m,
+        cols=cols,
+        sections=sections,
+        cell_w=cell_w,
+        name_row_height=NAME_ROW_HEIGHT_PT,
+        image_row_height=image_row_height,
+        heading_height=HEADING_HEIGHT_PT,
+        line_pt=LINE_PT,
+        gap_height=GAP_HEIGHT_PT,
+        content_top_y=content_top,
+        section_height=section_height,
+        gap_band_height=gap_band_height,
+        heading_line_y=heading_line_y,
+        name_rects=tuple(name_rects),
+        image_rects=tuple(image_rects),
+        separator_lines=tuple(lines),
+        gap_rects=gap_rects,
+    )
+
+
+def get_receipt_grid_geometry(
+    page_size: tuple[float, float] | None = None,
+    cols: int = COLS,
+    sections: int = SECTIONS,
+) -> ReceiptGridGeometry:
+    """Return the memoized ReceiptGridGeometry for this page size and grid density."""
+    w, h = page_size or get_page_size()
+    return _build_geometry(float(w), float(h), cols, sections)
 
 
-def _section_top_y(layout: dict, section: int) -> float:
-    """Y (bottom-left coords) of the top of this section (below name row + line, so top of image row)."""
-    ct = layout["content_top_y"]
-    sh = layout["section_height"]
-    gb = layout["gap_band_height"]
-    # Section 0 top = ct - 0 - 0 = ct (top of name row). Bottom of section 0 = ct - sh.
-    # Section 1 starts after GAP: top = ct - sh - gb. Section 2: ct - 2*sh - 2*gb.
-    return ct - section * (sh + gb)
+def get_receipt_grid_layout(page_size: tuple[float, float] | None = None) -> dict:
+    """
+    Layout for receipt print: heading, line, then 3 sections with GAPs between.
+    Returns dict with: margin, cols, sections, cell_w, name_row_height, image_row_height,
+    heading_height, line_pt, gap_height, page_w, page_h, content_top_y,
+    section_height, gap_band_height. Prefer get_receipt_grid_geometry() in hot paths.
+    """
+    g = get_receipt_grid_geometry(page_size)
+    return {
+        "margin": g.margin,
+        "cols": g.cols,
+        "sections": g.sections,
+        "cell_w": g.cell_w,
+        "name_row_height": g.name_row_height,
+        "image_row_height": g.image_row_height,
+        "heading_height": g.heading_height,
+        "line_pt": g.line_pt,
+        "gap_height": g.gap_height,
+        "page_w": g.page_w,
+        "page_h": g.page_h,
+        "content_top_y": g.content_top_y,
+        "section_height": g.section_height,
+        "gap_band_height": g.gap_band_height,
+    }
 
 
 def get_receipt_cell_rect(
@@ -99,85 +197,28 @@ def get_receipt_cell_rect(
     Return (left_pt, bottom_pt, width_pt, height_pt) for a cell.
     cell_type is 'name' or 'image'. section 0,1,2.
     """
-    layout = get_receipt_grid_layout(page_size)
-    m = layout["margin"]
-    cw = layout["cell_w"]
-    ph = layout["page_h"]
-    section_top = _section_top_y(layout, section)
-    name_h = layout["name_row_height"]
-    image_h = layout["image_row_height"]
-    line_pt = layout["line_pt"]
-
-    left = m + col * cw
-    if cell_type == "name":
-        # Name row is at top of section
-        bottom = section_top - name_h
-        return (left, bottom, cw, name_h)
-    else:  # image
-        # Image row is below the line
-        bottom = section_top - name_h - line_pt - image_h
-        return (left, bottom, cw, image_h)
+    return get_receipt_grid_geometry(page_size).cell_rect(section, col, cell_type)
 
 
 def iter_receipt_cells(page_size: tuple[float, float] | None = None):
     """Yield (section, col, cell_type, left, bottom, width, height) for each cell. Order: section 0..2, name then image, col 0..4."""
-    layout = get_receipt_grid_layout(page_size)
-    for section in range(layout["sections"]):
-        for col in range(layout["cols"]):
+    g = get_receipt_grid_geometry(page_size)
+    for section in range(g.sections):
+        for col in range(g.cols):
             for cell_type in ("name", "image"):
-                left, bottom, w, h = get_receipt_cell_rect(section, col, cell_type, page_size)
-                yield section, col, cell_type, left, bottom, w, h
+                yield (section, col, cell_type, *g.cell_rect(section, col, cell_type))
 
 
 def get_heading_line_y(page_size: tuple[float, float] | None = None) -> float:
     """Y position of the horizontal line below the heading."""
-    layout = get_receipt_grid_layout(page_size)
-    return layout["page_h"] - layout["margin"] - layout["heading_height"]
+    return get_receipt_grid_geometry(page_size).heading_line_y
 
 
 def get_section_separator_lines(page_size: tuple[float, float] | None = None) -> list[tuple[float, float, float, float]]:
     """List of (x1, y, x2, y) for horizontal lines: below heading, below each name row, above/below each GAP."""
-    layout = get_receipt_grid_layout(page_size)
-    m, w = layout["margin"], layout["page_w"]
-    lines = []
-    # Line below heading
-    y = get_heading_line_y(page_size)
-    lines.append((m, y, w - m, y))
-
-    ct = layout["content_top_y"]
-    sh = layout["section_height"]
-    gb = layout["gap_band_height"]
-    name_h = layout["name_row_height"]
-    line_pt = layout["line_pt"]
-
-    for s in range(layout["sections"]):
-        section_top = ct - s * (sh + gb)
-        # Line below name row (above image row)
-        y = section_top - name_h
-        lines.append((m, y, w - m, y))
-        # Line below image row (top of section bottom or top of GAP)
-        y = section_top - name_h - line_pt - layout["image_row_height"]
-        lines.append((m, y, w - m, y))
-
-    # GAP band boundaries: after section 0 and 1, we have a GAP. Top of GAP = bottom of section (already have line). Bottom of GAP = top of next section - so we need line at top of next section (which is section_top for s+1). So line at section_top for s=1 and s=2.
-    for s in range(1, layout["sections"]):
-        section_top_next = ct - s * (sh + gb)
-        lines.append((m, section_top_next, w - m, section_top_next))
-
-    return lines
+    return list(get_receipt_grid_geometry(page_size).separator_lines)
 
 
 def get_gap_rects(page_size: tuple[float, float] | None = None) -> list[tuple[float, float, float, float]]:
     """List of (left, bottom, width, height) for each GAP band (for drawing 'GAP' text or background)."""
-    layout = get_receipt_grid_layout(page_size)
-    m, w = layout["margin"], layout["page_w"]
-    ct = layout["content_top_y"]
-    sh = layout["section_height"]
-    gb = layout["gap_band_height"]
-    usable_w = w - 2 * m
-
-    rects = []
-    for s in range(layout["sections"] - 1):
-        bottom = ct - (s + 1) * (sh + gb)
-        rects.append((m, bottom, usable_w, gb))
-    return rects
+    return list(get_receipt_grid_geometry(page_size).gap_rects)
@@ -0,0 +1,69 @@
+"""
+Text measurement for PDF exports: cached glyph widths and fit-to-width truncation.
+
+Glyph advance widths are looked up once per (font, character) and reused for every size, so
+measuring a string is a sum of dict lookups instead of a ReportLab stringWidth call. Fitting
+text to a cell binary-searches the prefix widths, and results are memoized because the same
+strings (category names, receipt file names) repeat across rows and pages.
+
+Public API:
+- text_width(): width of text in points for a font and size.
+- fit_text(): text truncated with a suffix (default "…") so it fits max_width.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+
+try:
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    HAS_REPORTLAB = True
+except ImportError:
+    HAS_REPORTLAB = False
+
+ELLIPSIS = "…"
+
+# font name -> {char: advance width at size 1}
+_glyph_widths: dict[str, dict[str, float]] = {}
+
+
+def _glyph_width(font: str, ch: str) -> float:
+    widths = _glyph_widths.setdefault(font, {})
+    w = widths.get(ch)
+    if w is None:
+        w = stringWidth(ch, font, 1000) / 1000
+        widths[ch] = w
+    return w
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    """Return the width of text in points (same result as ReportLab stringWidth, without kerning)."""
+    if not text:
+        return 0.0
+    if not HAS_REPORTLAB:
+        raise RuntimeError("Install reportlab for PDF export: pip install reportlab")
+    return sum(_glyph_width(font, ch) for ch in text) * size
+
+
+@lru_cache(maxsize=4096)
+def fit_text(
+    text: str,
+    max_width: float,
+    font: str = "Helvetica",
+    size: float = 8,
+    suffix: str = ELLIPSIS,
+) -> str:
+    """
+    Return text unchanged if it fits max_width, else its longest prefix + suffix that fits.
+    Returns suffix alone if not even one character fits.
+    """
+    if not text or text_width(text, font, size) <= max_width:
+        return text
+    budget = max_width - text_width(suffix, font, size)
+    # prefix[k] = width of text[:k]; find the largest k with prefix[k] <= budget
+    prefix = list(accumulate((_glyph_width(font, ch) * size for ch in text), initial=0.0))
+    k = bisect_right(prefix, budget) - 1
+    return text[:k] + suffix if k > 0 else suffix
@@ -0,0 +1,95 @@
+"""
+Columnar view of transaction rows for totals, sorting and filtering.
+
+Rows from Supabase are lists of dicts with dates as strings and amounts as JSON numbers or
+strings. TransactionFrame parses them once into a pandas DataFrame with typed date
+(datetime64) and amount (float64) columns, so filters, sort keys and group totals are
+vectorized. The original dicts are kept and returned by records(), in frame order.
+
+Public API:
+- TransactionFrame: in_year() / in_month() / for_user() / chronological() / newest_first()
+  return new frames; total(), totals_by(), amounts(), years(), months(), records().
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+_COLUMNS = ("id", "date", "user", "category", "amount")
+
+
+class TransactionFrame:
+    """Typed, columnar transactions built once per fetch; filters return new frames."""
+
+    def __init__(self, rows: list[dict]) -> None:
+        self._rows = rows
+        df = pd.DataFrame.from_records(rows, columns=list(_COLUMNS)) if rows else pd.DataFrame(columns=list(_COLUMNS))
+        df["id"] = df["id"].fillna("").astype(str)
+        df["user"] = df["user"].fillna("").astype(str)
+        df["category"] = df["category"].fillna("").astype(str)
+        df["date"] = pd.to_datetime(df["date"].astype(str).str[:10], format="%Y-%m-%d", errors="coerce")
+        df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0.0).astype("float64")
+        self.df = df  # index = position in self._rows
+
+    @classmethod
+    def _view(cls, parent: "TransactionFrame", df: pd.DataFrame) -> "TransactionFrame":
+        frame = cls.__new__(cls)
+        frame._rows = parent._rows
+        frame.df = df
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    # -------------------------------------------------------------------------
+    # Filters and sorting (each returns a new frame over the same rows)
+    # -------------------------------------------------------------------------
+    def in_year(self, year: int) -> "TransactionFrame":
+        return self._view(self, self.df[self.df["date"].dt.year == year])
+
+    def in_month(self, year: int, month: int) -> "TransactionFrame":
+        dates = self.df["date"]
+        return self._view(self, self.df[(dates.dt.year == year) & (dates.dt.month == month)])
+
+    def for_user(self, user: str | None) -> "TransactionFrame":
+        """Rows for user; None or "" keeps every user."""
+        if not user:
+            return self
+        return self._view(self, self.df[self.df["user"] == user])
+
+    def chronological(self) -> "TransactionFrame":
+        """Sort by date ascending, then id (rows without a date first, as in sort_transactions_chronological)."""
+        df = self.df.sort_values(["date", "id"], na_position="first", kind="stable")
+        return self._view(self, df)
+
+    def newest_first(self) -> "TransactionFrame":
+        """Sort by date descending; ties keep their current order, rows without a date last."""
+        df = self.df.sort_values("date", ascending=False, na_position="last", kind="stable")
+        return self._view(self, df)
+
+    # -------------------------------------------------------------------------
+    # Aggregates and output
+    # -------------------------------------------------------------------------
+    def total(self) -> float:
+        return float(self.df["amount"].sum())
+
+    def totals_by(self, column: str) -> dict:
+        """Return {value: total amount} grouped by column (e.g. "category", "user")."""
+        return {k: float(v) for k, v in self.df.groupby(column, sort=True)["amount"].sum().items()}
+
+    def amounts(self):
+        """Amounts in frame order as a float64 numpy array."""
+        return self.df["amount"].to_numpy()
+
+    def years(self) -> list[int]:
+        """Distinct years, newest first."""
+        return sorted({int(y) for y in self.df["date"].dt.year.dropna().unique()}, reverse=True)
+
+    def months(self) -> list[str]:
+        """Distinct months as "YYYY-MM", newest first."""
+        return sorted(set(self.df["date"].dropna().dt.strftime("%Y-%m")), reverse=True)
+
+    def records(self) -> list[dict]:
+        """The original row dicts, in frame order."""
+        rows = self._rows
+        return [rows[i] for i in self.df.index]
@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+from io import BytesIO
+from typing import BinaryIO
+
 
 def sort_transactions_chronological(transactions: list[dict]) -> list[dict]:
     """Return a new list sorted by date ascending, then id (stable for statement/receipts)."""
@@ -15,3 +18,7 @@ def receipt_filename_from_url(url: str) -> str:
     path = url.rstrip("/").split("?", 1)[0]
     return path.rstrip("/").split("/")[-1] or ""
 
+
+def pdf_buffer_value(output_buffer: BinaryIO | None) -> bytes | None:
+    """Return the bytes written to an in-memory buffer; None for files and paths (nothing is copied)."""
+    return output_buffer.getvalue() if isinstance(output_buffer, BytesIO) else None